@@ -16,10 +16,17 @@ from routes.chatbot import chatbot_bp
 from routes.auth import auth_bp
 from routes.report import report_bp
 from config import Config
+from utils.json_provider import OrjsonProvider
+from utils.converters import ObjectIdConverter
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
+
+    # Match /api/patients and /api/patients/ alike instead of 308-redirecting
+    app.url_map.strict_slashes = False
+    app.url_map.converters["objectid"] = ObjectIdConverter
 
     CORS(app, resources={r"/*": {"origins": "*"}})
 
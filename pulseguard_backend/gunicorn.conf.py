@@ -0,0 +1,22 @@
+"""
+PulseGuard AI - Gunicorn Configuration
+Usage: gunicorn -c gunicorn.conf.py app:app
+
+Every route is I/O-bound (MongoDB queries, Groq LLM calls), so workers use
+the threaded `gthread` class: a request waiting on the network parks its
+thread (PyMongo and httpx release the GIL) instead of pinning a whole process.
+"""
+
+import multiprocessing
+import os
+
+bind         = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = "gthread"
+workers      = int(os.environ.get("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count())))
+threads      = int(os.environ.get("GUNICORN_THREADS", 16))
+timeout      = 60   # LLM completions can take several seconds
+keepalive    = 5
+
+# Import the app (and load the ML model) once in the master, then fork workers
+# so they share the model's memory pages.
+preload_app  = True
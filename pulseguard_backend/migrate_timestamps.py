@@ -0,0 +1,74 @@
+"""
+PulseGuard AI - Timestamp Backfill (one-off)
+Usage: python migrate_timestamps.py
+
+Older documents stored timestamps as ISO strings; new writes store BSON
+datetimes. MongoDB sorts by BSON type before value, so a mix of the two
+breaks newest-first ordering and date-range queries. This converts every
+remaining string in place. Safe to re-run: only string values are touched.
+"""
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+load_dotenv()   # before utils.db reads MONGO_URI at import
+
+from utils.db import MONGO_URI
+
+# collection -> top-level timestamp fields written by utils/db.py and auth.py
+TIMESTAMP_FIELDS = {
+    "users":    ("created_at",),
+    "patients": ("created_at", "updated_at"),
+    "alerts":   ("created_at", "acknowledged_at"),
+}
+
+
+def _to_date(path: str) -> dict:
+    # utcnow().isoformat() carries microseconds; $dateFromString takes milliseconds.
+    # No offset in the string, so it is read as UTC. Unparsable values are kept.
+    return {"$dateFromString": {
+        "dateString": {"$substrCP": [path, 0, 23]},
+        "onError":    path,
+    }}
+
+
+def backfill_field(collection, field: str) -> int:
+    result = collection.update_many(
+        {field: {"$type": "string"}},
+        [{"$set": {field: _to_date(f"${field}")}}],
+    )
+    return result.modified_count
+
+
+def backfill_visit_dates(patients) -> int:
+    result = patients.update_many(
+        {"visits.visit_date": {"$type": "string"}},
+        [{"$set": {"visits": {"$map": {
+            "input": "$visits",
+            "as":    "v",
+            "in":    {"$cond": [
+                {"$eq": [{"$type": "$$v.visit_date"}, "string"]},
+                {"$mergeObjects": ["$$v", {"visit_date": _to_date("$$v.visit_date")}]},
+                "$$v",
+            ]},
+        }}}}],
+    )
+    return result.modified_count
+
+
+def main():
+    # Own client: no socket timeout for long update_many calls over large
+    # collections, and none of get_db()'s warm-up/index work
+    client = MongoClient(MONGO_URI, socketTimeoutMS=None)
+    try:
+        db = client["pulseguard"]
+        for name, fields in TIMESTAMP_FIELDS.items():
+            for field in fields:
+                print(f"{name}.{field}: {backfill_field(db[name], field)} updated")
+        print(f"patients.visits.visit_date: {backfill_visit_dates(db.patients)} updated")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+PulseGuard AI - Model Weight Export
+Usage: python models/export_weights.py
+
+Writes models/pulseguard_model.npz — the fitted LogisticRegression and
+MinMaxScaler arrays as plain numpy — from pulseguard_model.pkl + scaler.pkl.
+The API loads the .npz without unpickling anything. A hash of the pickles is
+stored alongside; if they change, the API ignores the .npz until this is re-run.
+"""
+
+import os
+import sys
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.ml_engine import (
+    MODEL_PATH, SCALER_PATH, WEIGHTS_PATH, _params_from_sklearn, _pickles_digest,
+)
+
+
+def main():
+    params = _params_from_sklearn(joblib.load(MODEL_PATH), joblib.load(SCALER_PATH))
+    params["source_digest"] = _pickles_digest()
+    np.savez(WEIGHTS_PATH, **{k: np.asarray(v) for k, v in params.items()})
+    print(f"Saved {os.path.normpath(WEIGHTS_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
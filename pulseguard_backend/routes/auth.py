@@ -7,21 +7,65 @@ GET  /api/auth/me        → Get current user
 
 from flask import Blueprint, request, jsonify, current_app
 from utils.db import get_db
+from bson import ObjectId
 from datetime import datetime, timedelta
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from pymongo.errors import DuplicateKeyError
+from cachetools import TTLCache
 import hashlib
 import hmac
 import jwt
 import os
+import threading
+import time
 
 auth_bp = Blueprint("auth", __name__)
 
-SECRET_KEY = os.environ.get("SECRET_KEY", "pulseguard-secret-key-change-in-prod")
+SECRET_KEY    = os.environ.get("SECRET_KEY", "pulseguard-secret-key-change-in-prod")
+_SECRET_BYTES = SECRET_KEY.encode()   # PyJWT would otherwise re-encode per call
+
+# Verified tokens (payload + parsed user ObjectId, reused until the token's own
+# `exp`) and /me profiles
+_token_cache = TTLCache(maxsize=10_000, ttl=3600)
+_user_cache  = TTLCache(maxsize=10_000, ttl=60)
+_cache_lock  = threading.Lock()
+
+_hasher = PasswordHasher()
+
+# Verified against when the email is unknown, so login takes the same time
+# whether or not the account exists
+_DUMMY_HASH = _hasher.hash("pulseguard-dummy-password")
 
 
 def hash_password(password: str) -> str:
+    return _hasher.hash(password)
+
+
+def _legacy_hash(password: str) -> str:
+    """Unsalted SHA-256 used before Argon2; kept only to migrate old accounts."""
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def verify_password(stored_hash: str, password: str) -> bool:
+    if stored_hash.startswith("$argon2"):
+        try:
+            return _hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    # Pay for one Argon2 verify like every other path, so a legacy account's
+    # fast SHA-256 check doesn't reveal that the email exists
+    try:
+        _hasher.verify(_DUMMY_HASH, password)
+    except (VerificationError, InvalidHashError):
+        pass
+    return hmac.compare_digest(stored_hash, _legacy_hash(password))
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    return not stored_hash.startswith("$argon2") or _hasher.check_needs_rehash(stored_hash)
+
+
 def generate_token(user_id: str, role: str) -> str:
     payload = {
         "user_id": user_id,
@@ -29,17 +73,33 @@ def generate_token(user_id: str, role: str) -> str:
         "exp":     datetime.utcnow() + timedelta(hours=24),
         "iat":     datetime.utcnow(),
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    return jwt.encode(payload, _SECRET_BYTES, algorithm="HS256")
 
 
-def verify_token(token: str) -> dict:
+def _token_entry(token: str) -> dict:
+    """Return {"payload", "oid"} for a valid token, or None."""
+    with _cache_lock:
+        entry = _token_cache.get(token)
+    if entry is not None and entry["payload"]["exp"] > time.time():
+        return entry
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, _SECRET_BYTES, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+    entry = {"payload": payload, "oid": ObjectId(payload["user_id"])}
+    with _cache_lock:
+        _token_cache[token] = entry
+    return entry
+
+
+def verify_token(token: str) -> dict:
+    entry = _token_entry(token)
+    return entry["payload"] if entry else None
+
 
 # ─── POST /api/auth/register ──────────────────────────────────────────────────
 @auth_bp.route("/register", methods=["POST"])
@@ -66,7 +126,7 @@ def register():
         return jsonify({"error": "role must be 'doctor' or 'admin'"}), 400
 
     db = get_db()
-    if db.users.find_one({"email": data["email"]}):
+    if db.users.find_one({"email": data["email"].lower()}):
         return jsonify({"error": "Email already registered"}), 409
 
     user = {
@@ -74,9 +134,13 @@ def register():
         "email":      data["email"].lower(),
         "password":   hash_password(data["password"]),
         "role":       data["role"],
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": datetime.utcnow(),
     }
-    result  = db.users.insert_one(user)
+    try:
+        result = db.users.insert_one(user)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email
+        return jsonify({"error": "Email already registered"}), 409
     user_id = str(result.inserted_id)
     token   = generate_token(user_id, data["role"])
 
@@ -102,11 +166,19 @@ def login():
         return jsonify({"error": "email and password required"}), 400
 
     db   = get_db()
-    user = db.users.find_one({"email": email})
+    user = db.users.find_one(
+        {"email": email},
+        {"password": 1, "role": 1, "name": 1, "email": 1},
+    )
 
-    if not user or user["password"] != hash_password(password):
+    password_ok = verify_password(user["password"] if user else _DUMMY_HASH, password)
+    if not user or not password_ok:
         return jsonify({"error": "Invalid credentials"}), 401
 
+    # Lazily upgrade legacy SHA-256 hashes to Argon2 on successful login
+    if needs_rehash(user["password"]):
+        db.users.update_one({"_id": user["_id"]}, {"$set": {"password": hash_password(password)}})
+
     user_id = str(user["_id"])
     token   = generate_token(user_id, user["role"])
 
@@ -133,25 +205,30 @@ def me():
     if not auth_header.startswith("Bearer "):
         return jsonify({"error": "Missing or invalid Authorization header"}), 401
 
-    token   = auth_header.split(" ", 1)[1]
-    payload = verify_token(token)
+    token = auth_header.split(" ", 1)[1]
+    entry = _token_entry(token)
 
-    if not payload:
+    if not entry:
         return jsonify({"error": "Invalid or expired token"}), 401
 
-    from bson import ObjectId
-    db   = get_db()
-    user = db.users.find_one({"_id": ObjectId(payload["user_id"])})
+    user_id = entry["payload"]["user_id"]
+    with _cache_lock:
+        profile = _user_cache.get(user_id)
 
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    if profile is None:
+        db   = get_db()
+        user = db.users.find_one({"_id": entry["oid"]}, {"password": 0})
 
-    return jsonify({
-        "success": True,
-        "user": {
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        profile = {
             "id":    str(user["_id"]),
             "name":  user["name"],
             "email": user["email"],
             "role":  user["role"],
         }
-    }), 200
+        with _cache_lock:
+            _user_cache[user_id] = profile
+
+    return jsonify({"success": True, "user": profile}), 200
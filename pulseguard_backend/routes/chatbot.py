@@ -2,22 +2,54 @@
 PulseGuard AI - AI Chatbot Routes
 POST /api/chatbot/explain   → Explain a risk report in simple language
 POST /api/chatbot/ask       → General health Q&A
+POST /api/chatbot/stream/ask → General health Q&A, streamed as Server-Sent Events
 POST /api/chatbot/advice/<patient_id> → Personalized advice based on history
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from collections import OrderedDict
+from functools import lru_cache
+import json
 import os
+import re
+import threading
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
+_GROQ_KEY = os.environ.get("OPENAI_API_KEY", "")
+
 # ─── Try to load OpenAI / LangChain ───────────────────────────────────────────
 try:
     from langchain_groq import ChatGroq
     from langchain_core.messages import SystemMessage, HumanMessage
+    from langchain_core.globals import set_llm_cache
+    from langchain_core.caches import InMemoryCache
+    import httpx
     LANGCHAIN_AVAILABLE = True
 except ImportError:
     LANGCHAIN_AVAILABLE = False
 
+
+def _init_llm_cache():
+    """
+    Serve repeated prompts from cache instead of a fresh Groq round-trip.
+    Uses Redis when REDIS_URL is set (shared across workers), else per-process memory.
+    """
+    redis_url = os.environ.get("REDIS_URL", "")
+    if redis_url:
+        try:
+            import redis
+            from langchain_community.cache import RedisCache
+            set_llm_cache(RedisCache(redis.from_url(redis_url)))
+            return
+        except ImportError:
+            pass
+    set_llm_cache(InMemoryCache(maxsize=1000))
+
+
+if LANGCHAIN_AVAILABLE:
+    _init_llm_cache()
+
 SYSTEM_PROMPT = """
 You are PulseGuard AI's health assistant — a friendly, empathetic, and knowledgeable
 medical companion specializing in hypertension and cardiovascular health.
@@ -34,21 +66,85 @@ IMPORTANT: Keep your responses concise but informative.
 - Do not offer unsolicited medical advice.
 """
 
+# Built once; identical leading message on every call also lets provider-side
+# prompt-prefix caching kick in.
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT) if LANGCHAIN_AVAILABLE else None
+
 
-def get_llm():
+@lru_cache(maxsize=4)
+def get_llm(temperature: float = 0.5):
+    """
+    One ChatGroq client per temperature for the life of the process, so the
+    underlying keep-alive connection pool is reused across requests.
+    """
     if not LANGCHAIN_AVAILABLE:
         return None
-    api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not api_key:
+    if not _GROQ_KEY:
         return None
-    
+
     return ChatGroq(
-        temperature=0.5,
+        temperature=temperature,
         model_name="llama-3.3-70b-versatile",
-        groq_api_key=api_key
+        groq_api_key=_GROQ_KEY,
+        max_retries=2,
+        http_client=_http_client(),
     )
 
 
+@lru_cache(maxsize=1)
+def _http_client():
+    return httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+    )
+
+
+# ─── Near-Duplicate Question Cache (/ask only) ───────────────────────────────
+# Paraphrases like "What foods lower BP?" / "Which foods lower my BP" differ only
+# in filler words, so they miss the exact-match LLM cache. Questions are reduced
+# to their content words in order and only an identical sequence is served from
+# cache; fuzzy overlap or an unordered set would hand one medical answer to a
+# question that differs by a single drug, stage or reading, or by which drug is
+# switched to which ("140/90" vs "90/140").
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "am", "be", "i", "my", "me", "you", "your",
+    "what", "which", "how", "can", "could", "should", "do", "does", "to", "for",
+    "of", "in", "on", "and", "or", "it", "any", "some", "there", "that", "with",
+    "please", "tell", "about",
+})
+ASK_CACHE_SIZE = 500
+
+_ask_cache      = OrderedDict()   # tuple(content words) -> reply
+_ask_cache_lock = threading.Lock()
+
+
+def _question_key(question: str) -> tuple:
+    words = re.findall(r"[a-z0-9]+", question.lower())
+    return tuple(
+        w[:-1] if len(w) > 3 and w.endswith("s") else w
+        for w in words if w not in _STOPWORDS
+    )
+
+
+def _cached_answer(key: tuple):
+    if not key:
+        return None
+    with _ask_cache_lock:
+        reply = _ask_cache.get(key)
+        if reply is not None:
+            _ask_cache.move_to_end(key)
+        return reply
+
+
+def _store_answer(key: tuple, reply: str):
+    if not key:
+        return
+    with _ask_cache_lock:
+        _ask_cache[key] = reply
+        _ask_cache.move_to_end(key)
+        if len(_ask_cache) > ASK_CACHE_SIZE:
+            _ask_cache.popitem(last=False)
+
+
 def fallback_response(topic: str, stage: str = None, risk_score: float = None) -> str:
     """Rule-based fallback when OpenAI is not configured."""
     if stage == "Crisis" or (risk_score and risk_score > 80):
@@ -90,6 +186,65 @@ def fallback_response(topic: str, stage: str = None, risk_score: float = None) -
         )
 
 
+# ─── Keyword Fallback for /ask ────────────────────────────────────────────────
+FALLBACK_REPLIES = {
+    "diet": (
+        "Foods that help lower blood pressure include:\n"
+        "• Leafy greens (spinach, kale)\n"
+        "• Berries (blueberries, strawberries)\n"
+        "• Bananas (high in potassium)\n"
+        "• Beets\n"
+        "• Oatmeal\n"
+        "• Garlic\n"
+        "• Fish rich in omega-3 (salmon, mackerel)\n\n"
+        "Reduce: salt, processed foods, red meat, alcohol."
+    ),
+    "exercise": (
+        "Exercise recommendations for hypertension:\n"
+        "• 150 minutes of moderate aerobic activity per week\n"
+        "• Brisk walking, swimming, cycling, or yoga are excellent choices\n"
+        "• Avoid heavy weightlifting without doctor approval\n"
+        "• Aim for 30 minutes, 5 days a week"
+    ),
+    "stress": (
+        "Stress management techniques:\n"
+        "• Deep breathing exercises (4-7-8 method)\n"
+        "• Meditation or mindfulness — even 10 min/day helps\n"
+        "• Regular sleep schedule (7-8 hours)\n"
+        "• Yoga or tai chi\n"
+        "• Limit news and social media intake"
+    ),
+    "default": (
+        "I'm PulseGuard AI. I can help you understand your blood pressure "
+        "results and offer lifestyle guidance. For specific medical advice, "
+        "please consult your doctor. You can ask me about:\n"
+        "• Your risk report\n"
+        "• Diet and nutrition for BP management\n"
+        "• Exercise recommendations\n"
+        "• Stress management tips"
+    ),
+}
+
+_KEYWORD_TOPICS = {
+    "food": "diet", "diet": "diet", "eat": "diet",
+    "exercise": "exercise", "workout": "exercise", "activity": "exercise",
+    "stress": "stress",
+}
+_TOPIC_PRIORITY = ("diet", "exercise", "stress")
+
+# Single-pass scan for every keyword at once
+_KEYWORD_RE = re.compile("|".join(_KEYWORD_TOPICS), re.IGNORECASE)
+
+
+def keyword_response(question: str) -> str:
+    """Simple keyword-based fallback for /ask when the LLM is not configured."""
+    topics = {_KEYWORD_TOPICS[m.lower()] for m in _KEYWORD_RE.findall(question)}
+    for topic in _TOPIC_PRIORITY:
+        if topic in topics:
+            return FALLBACK_REPLIES[topic]
+    return FALLBACK_REPLIES["default"]
+
+
 # ─── POST /api/chatbot/explain ────────────────────────────────────────────────
 @chatbot_bp.route("/explain", methods=["POST"])
 def explain_report():
@@ -110,18 +265,20 @@ def explain_report():
     alert_level = data.get("alert_level", "STABLE")
     name        = data.get("patient_name", "Patient")
 
-    llm = get_llm()
+    # temperature=0 keeps cached explanations valid for identical inputs
+    llm = get_llm(temperature=0)
     if llm:
+        # Fixed instructions first, patient-specific data last (shared prefix)
         prompt = (
+            "Please explain this result in simple, kind language and provide "
+            "3-5 actionable lifestyle recommendations. Keep it under 200 words.\n\n"
             f"Patient name: {name}\n"
             f"Hypertension Stage: {stage}\n"
             f"Risk Score: {risk_score:.1f}%\n"
-            f"Alert Level: {alert_level}\n\n"
-            f"Please explain this result in simple, kind language and provide "
-            f"3-5 actionable lifestyle recommendations. Keep it under 200 words."
+            f"Alert Level: {alert_level}"
         )
         try:
-            response = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=prompt)])
+            response = llm.invoke([_SYSTEM_MSG, HumanMessage(content=prompt)])
             reply    = response.content
         except Exception as e:
             reply = fallback_response(stage, stage, risk_score)
@@ -147,75 +304,85 @@ def ask():
 
     llm = get_llm()
     if llm:
+        key   = _question_key(question)
+        reply = _cached_answer(key)
+        if reply is not None:
+            return jsonify({"success": True, "response": reply}), 200
         try:
-            response = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=question)])
+            response = llm.invoke([_SYSTEM_MSG, HumanMessage(content=question)])
             reply    = response.content
+            _store_answer(key, reply)
         except Exception as e:
             print(f"Error calling LLM: {e}")
             reply = "I'm sorry, I'm having trouble connecting right now. Please consult your doctor for medical questions."
     else:
-        # Simple keyword-based fallback
-        q = question.lower()
-        if "food" in q or "diet" in q or "eat" in q:
-            reply = (
-                "Foods that help lower blood pressure include:\n"
-                "• Leafy greens (spinach, kale)\n"
-                "• Berries (blueberries, strawberries)\n"
-                "• Bananas (high in potassium)\n"
-                "• Beets\n"
-                "• Oatmeal\n"
-                "• Garlic\n"
-                "• Fish rich in omega-3 (salmon, mackerel)\n\n"
-                "Reduce: salt, processed foods, red meat, alcohol."
-            )
-        elif "exercise" in q or "workout" in q or "activity" in q:
-            reply = (
-                "Exercise recommendations for hypertension:\n"
-                "• 150 minutes of moderate aerobic activity per week\n"
-                "• Brisk walking, swimming, cycling, or yoga are excellent choices\n"
-                "• Avoid heavy weightlifting without doctor approval\n"
-                "• Aim for 30 minutes, 5 days a week"
-            )
-        elif "stress" in q:
-            reply = (
-                "Stress management techniques:\n"
-                "• Deep breathing exercises (4-7-8 method)\n"
-                "• Meditation or mindfulness — even 10 min/day helps\n"
-                "• Regular sleep schedule (7-8 hours)\n"
-                "• Yoga or tai chi\n"
-                "• Limit news and social media intake"
-            )
-        else:
-            reply = (
-                "I'm PulseGuard AI. I can help you understand your blood pressure "
-                "results and offer lifestyle guidance. For specific medical advice, "
-                "please consult your doctor. You can ask me about:\n"
-                "• Your risk report\n"
-                "• Diet and nutrition for BP management\n"
-                "• Exercise recommendations\n"
-                "• Stress management tips"
-            )
+        reply = keyword_response(question)
 
     return jsonify({"success": True, "response": reply}), 200
 
 
+# ─── POST /api/chatbot/stream/ask ─────────────────────────────────────────────
+@chatbot_bp.route("/stream/ask", methods=["POST"])
+def stream_ask():
+    """
+    Same as /ask, but streams the answer as Server-Sent Events so the first
+    tokens reach the client before the full completion is done.
+
+    Body:   { "question": "What foods lower blood pressure?" }
+    Stream: data: {"text": "..."}  ...  data: [DONE]
+    """
+    data     = request.get_json(force=True)
+    question = data.get("question", "").strip()
+
+    if not question:
+        return jsonify({"error": "question is required"}), 400
+
+    llm = get_llm()
+
+    def generate():
+        if not llm:
+            yield f"data: {json.dumps({'text': keyword_response(question)})}\n\n"
+        else:
+            key    = _question_key(question)
+            cached = _cached_answer(key)
+            if cached is not None:
+                yield f"data: {json.dumps({'text': cached})}\n\n"
+            else:
+                parts = []
+                try:
+                    for chunk in llm.stream([_SYSTEM_MSG, HumanMessage(content=question)]):
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield f"data: {json.dumps({'text': chunk.content})}\n\n"
+                    _store_answer(key, "".join(parts))
+                except Exception as e:
+                    print(f"Error streaming from LLM: {e}")
+                    yield f"data: {json.dumps({'error': 'LLM unavailable'})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ─── POST /api/chatbot/advice/<patient_id> ────────────────────────────────────
-@chatbot_bp.route("/advice/<patient_id>", methods=["POST"])
+@chatbot_bp.route("/advice/<objectid:patient_id>", methods=["POST"])
 def personalized_advice(patient_id: str):
     """
     Generate personalized advice based on patient's visit history.
     """
-    from utils.db import get_patient, get_visits
+    from utils.db import get_latest_visit_and_count
 
-    patient = get_patient(patient_id)
-    if not patient:
+    summary = get_latest_visit_and_count(patient_id)
+    if summary is None:
         return jsonify({"error": "Patient not found"}), 404
 
-    visits = get_visits(patient_id)
-    if not visits:
+    latest = summary["latest"]
+    if not latest:
         return jsonify({"message": "No visits recorded yet. No advice to generate."}), 200
 
-    latest  = visits[-1]
     stage   = latest.get("stage_label", "Unknown")
     risk    = latest.get("risk_score", 0)
     smoking = latest.get("smoking", 0)
@@ -223,19 +390,20 @@ def personalized_advice(patient_id: str):
     bmi     = latest.get("bmi", 0)
     stress  = latest.get("stress_level", 5)
 
-    llm = get_llm()
+    llm = get_llm(temperature=0)
     if llm:
+        # Fixed instructions first, patient-specific data last (shared prefix)
         prompt = (
-            f"Patient: {patient.get('name', 'Patient')}\n"
+            "Give personalized, specific, and actionable health recommendations "
+            "based on this patient's profile. Be encouraging. Keep it under 250 words.\n\n"
+            f"Patient: {summary.get('name', 'Patient')}\n"
             f"Latest Stage: {stage}, Risk Score: {risk:.1f}%\n"
             f"BMI: {bmi:.1f}, Smoking: {'Yes' if smoking else 'No'}, "
             f"Alcohol: {'Yes' if alcohol else 'No'}, Stress Level: {stress}/10\n"
-            f"Number of visits: {len(visits)}\n\n"
-            "Give personalized, specific, and actionable health recommendations "
-            "based on this patient's profile. Be encouraging. Keep it under 250 words."
+            f"Number of visits: {summary['count']}"
         )
         try:
-            response = llm.invoke([SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=prompt)])
+            response = llm.invoke([_SYSTEM_MSG, HumanMessage(content=prompt)])
             advice   = response.content
         except Exception as e:
             advice = fallback_response(stage, stage, risk)
@@ -11,10 +11,11 @@ POST   /api/patients/alerts/<id>/acknowledge → Acknowledge alert
 """
 
 from flask import Blueprint, request, jsonify
+from bson import ObjectId
 from utils.db import (
     create_patient, get_patient, get_all_patients,
-    update_patient, delete_patient, get_visits,
-    get_alerts, acknowledge_alert,
+    update_patient, delete_patient, get_visits_or_patient_missing,
+    get_alerts, get_alerts_paginated, acknowledge_alert,
 )
 from utils.validators import validate_patient_profile
 
@@ -50,13 +51,27 @@ def create():
 # ─── GET /api/patients/ ───────────────────────────────────────────────────────
 @patients_bp.route("/", methods=["GET"])
 def list_patients():
-    limit    = int(request.args.get("limit", 100))
-    patients = get_all_patients(limit=limit)
-    return jsonify({"success": True, "count": len(patients), "patients": patients}), 200
+    """
+    Cursor-paginated patient list, newest first.
+    Query: ?limit=50&after=<next_cursor from the previous page>
+    """
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    after = request.args.get("after")
+    if after and not ObjectId.is_valid(after):
+        return jsonify({"error": "after must be a patient id"}), 400
+
+    patients    = get_all_patients(limit=limit, after=after)
+    next_cursor = patients[-1]["_id"] if len(patients) == limit else None
+    return jsonify({
+        "success":     True,
+        "count":       len(patients),
+        "patients":    patients,
+        "next_cursor": next_cursor,
+    }), 200
 
 
 # ─── GET /api/patients/<id> ───────────────────────────────────────────────────
-@patients_bp.route("/<patient_id>", methods=["GET"])
+@patients_bp.route("/<objectid:patient_id>", methods=["GET"])
 def get(patient_id):
     patient = get_patient(patient_id)
     if not patient:
@@ -65,7 +80,7 @@ def get(patient_id):
 
 
 # ─── PUT /api/patients/<id> ───────────────────────────────────────────────────
-@patients_bp.route("/<patient_id>", methods=["PUT"])
+@patients_bp.route("/<objectid:patient_id>", methods=["PUT"])
 def update(patient_id):
     data    = request.get_json(force=True)
     updated = update_patient(patient_id, data)
@@ -75,7 +90,7 @@ def update(patient_id):
 
 
 # ─── DELETE /api/patients/<id> ────────────────────────────────────────────────
-@patients_bp.route("/<patient_id>", methods=["DELETE"])
+@patients_bp.route("/<objectid:patient_id>", methods=["DELETE"])
 def delete(patient_id):
     deleted = delete_patient(patient_id)
     if not deleted:
@@ -84,13 +99,13 @@ def delete(patient_id):
 
 
 # ─── GET /api/patients/<id>/visits ───────────────────────────────────────────
-@patients_bp.route("/<patient_id>/visits", methods=["GET"])
+@patients_bp.route("/<objectid:patient_id>/visits", methods=["GET"])
 def visit_history(patient_id):
-    patient = get_patient(patient_id)
-    if not patient:
+    result = get_visits_or_patient_missing(patient_id)
+    if result is None:
         return jsonify({"error": "Patient not found"}), 404
 
-    visits = get_visits(patient_id)
+    visits = result["visits"]
     return jsonify({
         "success":      True,
         "patient_id":   patient_id,
@@ -100,7 +115,7 @@ def visit_history(patient_id):
 
 
 # ─── GET /api/patients/<id>/alerts ───────────────────────────────────────────
-@patients_bp.route("/<patient_id>/alerts", methods=["GET"])
+@patients_bp.route("/<objectid:patient_id>/alerts", methods=["GET"])
 def patient_alerts(patient_id):
     unread_only = request.args.get("unread", "false").lower() == "true"
     alerts      = get_alerts(patient_id=patient_id, unacknowledged_only=unread_only)
@@ -110,14 +125,32 @@ def patient_alerts(patient_id):
 # ─── GET /api/patients/alerts/all ─────────────────────────────────────────────
 @patients_bp.route("/alerts/all", methods=["GET"])
 def all_alerts():
-    """Get all alerts across all patients (doctor dashboard)."""
+    """
+    Get alerts across all patients (doctor dashboard), newest first.
+    Query: ?unread=true&page=1&page_size=50
+    """
     unread_only = request.args.get("unread", "false").lower() == "true"
-    alerts      = get_alerts(unacknowledged_only=unread_only)
-    return jsonify({"success": True, "count": len(alerts), "alerts": alerts}), 200
+    page        = max(request.args.get("page", 1, type=int), 1)
+    page_size   = min(max(request.args.get("page_size", 50, type=int), 1), 200)
+
+    result = get_alerts_paginated(
+        unacknowledged_only = unread_only,
+        skip                = (page - 1) * page_size,
+        limit               = page_size,
+    )
+    return jsonify({
+        "success":   True,
+        "count":     len(result["alerts"]),
+        "total":     result["total"],
+        "unread":    result["unread"],
+        "page":      page,
+        "page_size": page_size,
+        "alerts":    result["alerts"],
+    }), 200
 
 
 # ─── POST /api/patients/alerts/<alert_id>/acknowledge ─────────────────────────
-@patients_bp.route("/alerts/<alert_id>/acknowledge", methods=["POST"])
+@patients_bp.route("/alerts/<objectid:alert_id>/acknowledge", methods=["POST"])
 def ack_alert(alert_id):
     success = acknowledge_alert(alert_id)
     if not success:
@@ -8,7 +8,7 @@ GET  /api/predict/risk/<patient_id> → Full risk history + drift
 from flask import Blueprint, request, jsonify
 from utils.ml_engine import predict_hypertension, detect_risk_drift, build_risk_summary
 from utils.validators import validate_patient_input, sanitize_input
-from utils.db import add_visit, get_visits, get_patient, save_alert
+from utils.db import add_visit, get_patient, get_recent_risk_scores, save_alert
 from config import Config
 
 predict_bp = Blueprint("predict", __name__)
@@ -66,20 +66,16 @@ def predict_and_store_visit():
     if not valid:
         return jsonify({"error": error}), 400
 
-    patient = get_patient(patient_id)
-    if not patient:
+    # One round-trip: existence check + only the scores drift detection needs
+    risk_scores = get_recent_risk_scores(patient_id, Config.DRIFT_WINDOW)
+    if risk_scores is None:
         return jsonify({"error": "Patient not found"}), 404
 
     data   = sanitize_input(data)
     result = predict_hypertension(data)
 
-    # Store visit
-    visit_record = {**data, **result}
-    visit_id = add_visit(patient_id, visit_record)
-
-    # Drift detection
-    all_visits  = get_visits(patient_id)
-    risk_scores = [v["risk_score"] for v in all_visits]
+    # Drift detection over stored history plus this visit
+    risk_scores.append(result["risk_score"])
     drift       = detect_risk_drift(
         risk_scores,
         drift_threshold  = Config.DRIFT_THRESHOLD,
@@ -87,6 +83,10 @@ def predict_and_store_visit():
         window           = Config.DRIFT_WINDOW,
     )
 
+    # Store visit
+    visit_record = {**data, **result}
+    visit_id = add_visit(patient_id, visit_record)
+
     # Auto-save alert if needed
     alert_id = None
     if drift["alert_level"] in ("MODERATE", "HIGH"):
@@ -108,7 +108,7 @@ def predict_and_store_visit():
 
 
 # ─── GET /api/predict/risk/<patient_id> ───────────────────────────────────────
-@predict_bp.route("/risk/<patient_id>", methods=["GET"])
+@predict_bp.route("/risk/<objectid:patient_id>", methods=["GET"])
 def get_risk_history(patient_id: str):
     """
     Return full risk trajectory and drift summary for a patient.
@@ -117,11 +117,12 @@ def get_risk_history(patient_id: str):
     if not patient:
         return jsonify({"error": "Patient not found"}), 404
 
-    visits = get_visits(patient_id)
+    # Visits are embedded in the patient document — no second fetch needed
+    visits = patient.get("visits", [])
     if not visits:
         return jsonify({"message": "No visits recorded yet.", "timeline": []}), 200
 
-    summary = build_risk_summary(visits)
+    summary = build_risk_summary(visits, window=Config.DRIFT_WINDOW)
 
     return jsonify({
         "success":      True,
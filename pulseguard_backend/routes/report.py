@@ -3,19 +3,119 @@ PulseGuard AI - PDF Report Route
 
 POST /api/report/generate          → Generate PDF from raw inputs (no DB needed)
 GET  /api/report/patient/<id>      → Generate PDF from stored patient + latest visit
+POST /api/report/batch             → Predictions for many patients in one model pass
+GET  /api/report/status/<job_id>   → Status of a PDF requested with ?async=true
+GET  /api/report/download/<job_id> → Download a finished async PDF
 """
 
-from flask import Blueprint, request, jsonify, send_file
-import io
+from flask import Blueprint, Response, request, jsonify, url_for
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import numpy as np
+import orjson
+import threading
+import time
+import uuid
 from datetime import datetime
+from types import MappingProxyType
+from urllib.parse import quote
 
 from utils.pdf_report import generate_bp_report_pdf
-from utils.ml_engine import predict_hypertension, detect_risk_drift
-from utils.validators import validate_patient_input, sanitize_input
-from utils.db import get_patient, get_visits
+from utils.ml_engine import predict_hypertension, predict_hypertension_batch, detect_risk_drift
+from utils.validators import validate_patient_input, validate_patient_inputs_batch, sanitize_input
+from utils.db import get_patient_with_visits
+from config import Config
 
 report_bp = Blueprint("report", __name__)
 
+# Rendered PDFs keyed by a hash of their inputs and the current minute (the
+# header's "Report Date" resolution) — a repeated "Download" click skips
+# ReportLab entirely without serving a stale date
+_pdf_cache = TTLCache(maxsize=256, ttl=60)
+_pdf_lock  = threading.Lock()
+
+# Synchronous requests render on their own request thread. ?async=true
+# requests render on this pool and get a job id instead of waiting; jobs live
+# in this process only, so polling must reach the same worker.
+_BATCH_MAX = 500  # patients per /batch request
+_PDF_POOL  = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf")
+_jobs      = TTLCache(maxsize=1024, ttl=600)   # job_id → (future, filename)
+_jobs_lock = threading.Lock()
+
+
+def _load_body():
+    """
+    Parse the raw body with orjson (get_data(cache=False) skips keeping a
+    copy); None if it isn't valid JSON.
+    """
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _render_pdf(patient_data: dict, clinical_inputs: dict,
+                prediction_results: dict, recommendations: str) -> bytes:
+    minute  = int(time.time() // 60)   # same key the PDF header date uses
+    payload = [patient_data, clinical_inputs, prediction_results, recommendations, minute]
+    key = hashlib.blake2b(
+        json.dumps(payload, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+
+    with _pdf_lock:
+        pdf_bytes = _pdf_cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = generate_bp_report_pdf(
+            patient_data       = patient_data,
+            clinical_inputs    = clinical_inputs,
+            prediction_results = prediction_results,
+            recommendations    = recommendations,
+        )
+        with _pdf_lock:
+            _pdf_cache[key] = pdf_bytes
+    return pdf_bytes
+
+
+def _deliver_pdf(filename: str, **pdf_inputs):
+    """Render inline, or on the pool with a job id handed back for ?async=true."""
+    if request.args.get("async", "").lower() in ("1", "true"):
+        future = _PDF_POOL.submit(_render_pdf, **pdf_inputs)
+        job_id = uuid.uuid4().hex
+        with _jobs_lock:
+            _jobs[job_id] = (future, filename)
+        return jsonify({
+            "job_id":       job_id,
+            "status_url":   url_for("report.report_status",   job_id=job_id),
+            "download_url": url_for("report.report_download", job_id=job_id),
+        }), 202
+
+    return _pdf_response(_render_pdf(**pdf_inputs), filename)
+
+
+def _job_status(future) -> str:
+    if not future.done():
+        return "pending"
+    return "failed" if future.exception() else "done"
+
+
+def _pdf_response(pdf_bytes: bytes, filename: str) -> Response:
+    """Attachment response straight from the bytes (no BytesIO copy)."""
+    resp = Response(pdf_bytes, mimetype="application/pdf")
+    resp.headers["Content-Length"] = str(len(pdf_bytes))
+    try:
+        filename.encode("ascii")
+        names = {"filename": filename}
+    except UnicodeEncodeError:
+        # RFC 5987 form for non-ASCII patient names, like send_file() emits
+        names = {
+            "filename":  filename.encode("ascii", "ignore").decode(),
+            "filename*": f"UTF-8''{quote(filename)}",
+        }
+    resp.headers.set("Content-Disposition", "attachment", **names)
+    return resp
+
 
 # ─── POST /api/report/generate ────────────────────────────────────────────────
 @report_bp.route("/generate", methods=["POST"])
@@ -42,7 +142,9 @@ def generate_report():
       "recommendations": "Reduce salt intake, walk 30 min daily..."  // optional
     }
     """
-    data = request.get_json(force=True)
+    data = _load_body()
+    if data is None:
+        return jsonify({"error": "Request body must be valid JSON"}), 400
 
     patient_data    = data.get("patient_data", {})
     clinical_inputs = data.get("clinical_inputs", {})
@@ -62,36 +164,30 @@ def generate_report():
     if not recommendations:
         recommendations = _default_recommendations(prediction_results["stage_label"])
 
+    filename = f"PulseGuard_Report_{patient_data.get('name', 'Patient').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
     # Generate PDF
-    pdf_bytes = generate_bp_report_pdf(
+    return _deliver_pdf(
+        filename,
         patient_data       = patient_data,
         clinical_inputs    = clinical_inputs,
         prediction_results = prediction_results,
         recommendations    = recommendations,
     )
 
-    filename = f"PulseGuard_Report_{patient_data.get('name', 'Patient').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-
-    return send_file(
-        io.BytesIO(pdf_bytes),
-        mimetype="application/pdf",
-        as_attachment=True,
-        download_name=filename,
-    )
-
 
 # ─── GET /api/report/patient/<patient_id> ─────────────────────────────────────
-@report_bp.route("/patient/<patient_id>", methods=["GET"])
+@report_bp.route("/patient/<objectid:patient_id>", methods=["GET"])
 def generate_patient_report(patient_id: str):
     """
     Generate PDF report for a stored patient using their latest visit data.
     Requires MongoDB to be running.
     """
-    patient = get_patient(patient_id)
+    # One fetch: profile plus the visits drift looks at (the last is the latest)
+    patient, visits = get_patient_with_visits(patient_id, Config.DRIFT_WINDOW)
     if not patient:
         return jsonify({"error": "Patient not found"}), 404
 
-    visits = get_visits(patient_id)
     if not visits:
         return jsonify({"error": "No visits recorded for this patient yet."}), 404
 
@@ -115,75 +211,133 @@ def generate_patient_report(patient_id: str):
         "alert_level":  latest_visit.get("alert_level", "STABLE"),
     }
 
-    # Drift detection across all visits
+    # Drift detection across the recent visits
     if len(visits) >= 2:
         risk_scores = [v["risk_score"] for v in visits]
-        drift = detect_risk_drift(risk_scores)
+        drift = detect_risk_drift(risk_scores, window=Config.DRIFT_WINDOW)
         prediction_results["alert_level"] = drift["alert_level"]
 
     recommendations = _default_recommendations(prediction_results["stage_label"])
 
+    filename = f"PulseGuard_{patient.get('name', 'Patient').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+
     # Generate PDF
-    pdf_bytes = generate_bp_report_pdf(
+    return _deliver_pdf(
+        filename,
         patient_data       = {**patient, "patient_id": patient_id},
         clinical_inputs    = clinical_inputs,
         prediction_results = prediction_results,
         recommendations    = recommendations,
     )
 
-    filename = f"PulseGuard_{patient.get('name', 'Patient').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
 
-    return send_file(
-        io.BytesIO(pdf_bytes),
-        mimetype="application/pdf",
-        as_attachment=True,
-        download_name=filename,
-    )
+# ─── POST /api/report/batch ───────────────────────────────────────────────────
+@report_bp.route("/batch", methods=["POST"])
+def batch_predict():
+    """
+    Run predictions for many patients with one vectorised model call.
+
+    Body: { "patients": [ { clinical inputs as for /generate }, ... ] }
+    Response: { "count": N, "predictions": [ ...same order as input... ] }
+    """
+    data = _load_body()
+    if not isinstance(data, dict) or not isinstance(data.get("patients"), list):
+        return jsonify({"error": "Body must be {\"patients\": [ ... ]}"}), 400
+
+    patients = data["patients"]
+    if not patients:
+        return jsonify({"error": "patients must not be empty"}), 400
+    if len(patients) > _BATCH_MAX:
+        return jsonify({"error": f"At most {_BATCH_MAX} patients per batch"}), 400
+
+    for i, inputs in enumerate(patients):
+        if not isinstance(inputs, dict):
+            return jsonify({"error": f"patients[{i}] must be an object"}), 400
+
+    # One vectorised range check; the scalar validator only explains a failure
+    valid = validate_patient_inputs_batch(patients)
+    if not valid.all():
+        i = int(np.argmin(valid))
+        _, error = validate_patient_input(patients[i])
+        return jsonify({"error": f"patients[{i}]: {error}"}), 400
+
+    cleaned     = [sanitize_input(inputs) for inputs in patients]
+    predictions = predict_hypertension_batch(cleaned)
+    return jsonify({"count": len(predictions), "predictions": predictions}), 200
+
+
+# ─── GET /api/report/status/<job_id> ──────────────────────────────────────────
+@report_bp.route("/status/<job_id>", methods=["GET"])
+def report_status(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify({"job_id": job_id, "status": _job_status(job[0])}), 200
+
+
+# ─── GET /api/report/download/<job_id> ────────────────────────────────────────
+@report_bp.route("/download/<job_id>", methods=["GET"])
+def report_download(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    future, filename = job
+    status = _job_status(future)
+    if status == "pending":
+        return jsonify({"job_id": job_id, "status": status}), 202
+    if status == "failed":
+        return jsonify({"error": "Report generation failed"}), 500
+    return _pdf_response(future.result(), filename)
 
 
 # ─── Helper: Default Recommendations ──────────────────────────────────────────
 
+_RECS = MappingProxyType({
+    "Normal": (
+        "Great news! Your blood pressure is in the healthy range.\n\n"
+        "• Maintain your current healthy lifestyle\n"
+        "• Stay physically active — aim for 150 minutes of exercise per week\n"
+        "• Continue eating a balanced diet rich in fruits and vegetables\n"
+        "• Get 7-8 hours of quality sleep every night\n"
+        "• Manage stress through mindfulness or yoga\n"
+        "• Monitor your BP regularly every 6-12 months\n"
+    ),
+    "Stage 1": (
+        "Your blood pressure is mildly elevated. Lifestyle changes can make a big difference.\n\n"
+        "• Reduce sodium intake to less than 2,300 mg/day\n"
+        "• Follow the DASH diet — fruits, vegetables, whole grains, low-fat dairy\n"
+        "• Exercise at least 30 minutes a day, 5 days a week\n"
+        "• Limit alcohol consumption\n"
+        "• Quit smoking if applicable\n"
+        "• Lose weight if BMI is above 25\n"
+        "• Monitor BP at home daily\n"
+        "• Schedule a follow-up with your doctor within 3 months\n"
+    ),
+    "Stage 2": (
+        "Your blood pressure is significantly elevated. Please take action.\n\n"
+        "• Consult your doctor immediately — medication may be required\n"
+        "• Strictly reduce salt intake to less than 1,500 mg/day\n"
+        "• Avoid all processed and packaged foods\n"
+        "• Stop smoking and alcohol completely\n"
+        "• Monitor BP twice daily and keep a log\n"
+        "• Practice stress management daily (meditation, breathing exercises)\n"
+        "• Avoid heavy physical exertion until cleared by your doctor\n"
+        "• Follow up with your doctor every 2-4 weeks\n"
+    ),
+    "Crisis": (
+        "WARNING: Your blood pressure is at a critical level.\n\n"
+        "SEEK IMMEDIATE MEDICAL ATTENTION.\n\n"
+        "• Call emergency services or go to the nearest ER immediately\n"
+        "• Do NOT delay or wait for symptoms to worsen\n"
+        "• Avoid any physical activity or stress\n"
+        "• If prescribed medication, take it as directed immediately\n"
+        "• This level of BP can cause stroke, heart attack, or organ damage\n"
+    ),
+})
+
+
 def _default_recommendations(stage_label: str) -> str:
-    recs = {
-        "Normal": (
-            "Great news! Your blood pressure is in the healthy range.\n\n"
-            "• Maintain your current healthy lifestyle\n"
-            "• Stay physically active — aim for 150 minutes of exercise per week\n"
-            "• Continue eating a balanced diet rich in fruits and vegetables\n"
-            "• Get 7-8 hours of quality sleep every night\n"
-            "• Manage stress through mindfulness or yoga\n"
-            "• Monitor your BP regularly every 6-12 months\n"
-        ),
-        "Stage 1": (
-            "Your blood pressure is mildly elevated. Lifestyle changes can make a big difference.\n\n"
-            "• Reduce sodium intake to less than 2,300 mg/day\n"
-            "• Follow the DASH diet — fruits, vegetables, whole grains, low-fat dairy\n"
-            "• Exercise at least 30 minutes a day, 5 days a week\n"
-            "• Limit alcohol consumption\n"
-            "• Quit smoking if applicable\n"
-            "• Lose weight if BMI is above 25\n"
-            "• Monitor BP at home daily\n"
-            "• Schedule a follow-up with your doctor within 3 months\n"
-        ),
-        "Stage 2": (
-            "Your blood pressure is significantly elevated. Please take action.\n\n"
-            "• Consult your doctor immediately — medication may be required\n"
-            "• Strictly reduce salt intake to less than 1,500 mg/day\n"
-            "• Avoid all processed and packaged foods\n"
-            "• Stop smoking and alcohol completely\n"
-            "• Monitor BP twice daily and keep a log\n"
-            "• Practice stress management daily (meditation, breathing exercises)\n"
-            "• Avoid heavy physical exertion until cleared by your doctor\n"
-            "• Follow up with your doctor every 2-4 weeks\n"
-        ),
-        "Crisis": (
-            "WARNING: Your blood pressure is at a critical level.\n\n"
-            "SEEK IMMEDIATE MEDICAL ATTENTION.\n\n"
-            "• Call emergency services or go to the nearest ER immediately\n"
-            "• Do NOT delay or wait for symptoms to worsen\n"
-            "• Avoid any physical activity or stress\n"
-            "• If prescribed medication, take it as directed immediately\n"
-            "• This level of BP can cause stroke, heart attack, or organ damage\n"
-        ),
-    }
-    return recs.get(stage_label, "Please consult your healthcare provider for personalized recommendations.")
\ No newline at end of file
+    return _RECS.get(stage_label, "Please consult your healthcare provider for personalized recommendations.")
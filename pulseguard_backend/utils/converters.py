@@ -0,0 +1,13 @@
+"""
+PulseGuard AI - URL Converters
+"""
+
+from werkzeug.routing import BaseConverter
+
+
+class ObjectIdConverter(BaseConverter):
+    """
+    Matches a 24-hex MongoDB ObjectId, e.g. /api/patients/<objectid:patient_id>.
+    Malformed IDs 404 at routing time instead of raising inside ObjectId().
+    """
+    regex = r"[0-9a-fA-F]{24}"
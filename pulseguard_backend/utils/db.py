@@ -2,27 +2,94 @@
 PulseGuard AI - MongoDB Database Helper
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
 from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
+import threading
 
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/pulseguard")
 
-_client = None
-_db     = None
+_client    = None
+_db        = None
+_init_lock = threading.Lock()   # gthread workers: first requests race to init
+
+# Runs independent queries of one request side by side (PyMongo is thread-safe
+# and releases the GIL while waiting on the server)
+_QUERY_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mongo")
 
 
 def get_db():
     global _client, _db
-    if _db is None:
-        _client = MongoClient(MONGO_URI)
-        _db     = _client["pulseguard"]
+    if _db is not None:
+        return _db
+    with _init_lock:
+        if _db is not None:
+            return _db
+        client = MongoClient(
+            MONGO_URI,
+            maxPoolSize              = 50,
+            minPoolSize              = 5,      # keep warm sockets for the next request
+            connect                  = False,  # no sockets until first use (fork-safe)
+            serverSelectionTimeoutMS = 3000,   # fail fast instead of the 30 s default
+            socketTimeoutMS          = 5000,
+            retryWrites              = True,
+            compressors              = "zstd,zlib",  # zstd needs `zstandard`; zlib is the fallback
+        )
+        db = client["pulseguard"]
+        # Best-effort, once per process, off the request path: with Mongo down
+        # each step would otherwise block the first request on server selection
+        threading.Thread(target=_prepare, args=(client, db), daemon=True,
+                         name="mongo-warmup").start()
+        _client, _db = client, db
     return _db
 
 
+def _prepare(client, db):
+    _warm_up(client)
+    _ensure_indexes(db)
+
+
+def _warm_up(client):
+    """Open the first pooled connection now rather than on the first query."""
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"MongoDB ping failed: {e}")
+
+
+# (collection, keys, options) for each hot query predicate
+_INDEXES = (
+    ("users",  "email", {"unique": True}),
+    # One index per alert query shape, each ending in the created_at sort key
+    ("alerts", [("patient_id", ASCENDING), ("acknowledged", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("alerts", [("patient_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("alerts", [("acknowledged", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("alerts", [("created_at", DESCENDING)], {}),
+)
+
+
+def _ensure_indexes(db):
+    """
+    Index the hot query predicates. create_index is a no-op when the index
+    exists. Each index is attempted on its own, so one failure (e.g. duplicate
+    emails blocking the unique index) doesn't skip the rest.
+    """
+    for collection, keys, options in _INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+        except PyMongoError as e:
+            print(f"Could not create MongoDB index {collection}.{keys}: {e}")
+
+
 def serialize(doc) -> dict:
-    """Convert MongoDB document to JSON-serializable dict."""
+    """
+    Convert MongoDB document to JSON-serializable dict.
+    Timestamps are stored as BSON datetimes and left as-is; the orjson
+    provider renders them as ISO-8601 strings.
+    """
     if doc is None:
         return None
     doc["_id"] = str(doc["_id"])
@@ -37,7 +104,7 @@ def serialize_list(docs) -> list:
 
 def create_patient(data: dict) -> str:
     db  = get_db()
-    data["created_at"] = datetime.utcnow().isoformat()
+    data["created_at"] = datetime.utcnow()
     data["visits"]     = []
     result = db.patients.insert_one(data)
     return str(result.inserted_id)
@@ -49,9 +116,17 @@ def get_patient(patient_id: str) -> dict:
     return serialize(doc)
 
 
-def get_all_patients(limit: int = 100) -> list:
-    db   = get_db()
-    docs = db.patients.find().limit(limit).sort("created_at", -1)
+PATIENT_LIST_FIELDS = {"name": 1, "gender": 1, "date_of_birth": 1}
+
+
+def get_all_patients(limit: int = 50, after: str = None) -> list:
+    """
+    Newest-first page of patients (display fields only). Pass the last `_id`
+    of the previous page as `after` — an index range scan, unlike skip().
+    """
+    db    = get_db()
+    query = {"_id": {"$lt": ObjectId(after)}} if after else {}
+    docs  = db.patients.find(query, PATIENT_LIST_FIELDS).sort("_id", -1).limit(limit)
     return serialize_list(list(docs))
 
 
@@ -59,7 +134,7 @@ def update_patient(patient_id: str, data: dict) -> bool:
     db     = get_db()
     result = db.patients.update_one(
         {"_id": ObjectId(patient_id)},
-        {"$set": {**data, "updated_at": datetime.utcnow().isoformat()}}
+        {"$set": {**data, "updated_at": datetime.utcnow()}}
     )
     return result.modified_count > 0
 
@@ -74,7 +149,7 @@ def delete_patient(patient_id: str) -> bool:
 
 def add_visit(patient_id: str, visit_data: dict) -> str:
     db = get_db()
-    visit_data["visit_date"] = datetime.utcnow().isoformat()
+    visit_data["visit_date"] = datetime.utcnow()
     visit_data["visit_id"]   = str(ObjectId())
 
     db.patients.update_one(
@@ -84,11 +159,77 @@ def add_visit(patient_id: str, visit_data: dict) -> str:
     return visit_data["visit_id"]
 
 
+def get_recent_risk_scores(patient_id: str, n: int) -> list:
+    """
+    Risk scores of the patient's last `n` visits (oldest first), projected
+    server-side so no other visit fields cross the wire.
+    Returns None if the patient does not exist.
+    """
+    db   = get_db()
+    docs = list(db.patients.aggregate([
+        {"$match":   {"_id": ObjectId(patient_id)}},
+        {"$project": {
+            "_id":    0,
+            "scores": {"$slice": [{"$ifNull": ["$visits.risk_score", []]}, -n]},
+        }},
+    ]))
+    if not docs:
+        return None
+    return docs[0]["scores"]
+
+
+def get_latest_visit_and_count(patient_id: str) -> dict:
+    """
+    Patient name, most recent visit and total visit count in one round-trip,
+    without transferring the rest of the visit history.
+    Returns None if the patient does not exist; "latest" is None with no visits.
+    """
+    db   = get_db()
+    docs = list(db.patients.aggregate([
+        {"$match":   {"_id": ObjectId(patient_id)}},
+        {"$project": {
+            "_id":    0,
+            "name":   1,
+            "latest": {"$arrayElemAt": [{"$ifNull": ["$visits", []]}, -1]},
+            "count":  {"$size": {"$ifNull": ["$visits", []]}},
+        }},
+    ]))
+    if not docs:
+        return None
+    doc = docs[0]
+    doc.setdefault("latest", None)
+    return doc
+
+
+def get_visits_or_patient_missing(patient_id: str) -> dict:
+    """
+    {"visits": [...]} for an existing patient, None if the patient doesn't exist.
+    Existence check and visit fetch share one round-trip.
+    """
+    db  = get_db()
+    doc = db.patients.find_one({"_id": ObjectId(patient_id)}, {"_id": 0, "visits": 1})
+    if doc is None:
+        return None
+    return {"visits": doc.get("visits", [])}
+
+
+def get_patient_with_visits(patient_id: str, last_n: int = None) -> tuple:
+    """
+    (patient, visits) from a single find_one. With `last_n`, only the last
+    `last_n` visits are sliced server-side. The patient dict has no "visits"
+    key. Returns (None, []) if the patient does not exist.
+    """
+    db         = get_db()
+    projection = {"visits": {"$slice": -last_n}} if last_n else None
+    doc        = db.patients.find_one({"_id": ObjectId(patient_id)}, projection)
+    if doc is None:
+        return None, []
+    visits = doc.pop("visits", [])
+    return serialize(doc), visits
+
+
 def get_visits(patient_id: str) -> list:
-    patient = get_patient(patient_id)
-    if not patient:
-        return []
-    return patient.get("visits", [])
+    return get_patient_with_visits(patient_id)[1]
 
 
 # ─── Alert Storage ────────────────────────────────────────────────────────────
@@ -96,7 +237,7 @@ def get_visits(patient_id: str) -> list:
 def save_alert(patient_id: str, alert_data: dict) -> str:
     db = get_db()
     alert_data["patient_id"]  = patient_id
-    alert_data["created_at"]  = datetime.utcnow().isoformat()
+    alert_data["created_at"]  = datetime.utcnow()
     alert_data["acknowledged"] = False
     result = db.alerts.insert_one(alert_data)
     return str(result.inserted_id)
@@ -113,10 +254,36 @@ def get_alerts(patient_id: str = None, unacknowledged_only: bool = False) -> lis
     return serialize_list(list(docs))
 
 
+def get_alerts_paginated(unacknowledged_only: bool = False, skip: int = 0, limit: int = 50) -> dict:
+    """
+    One page of alerts (newest first) plus total and unread counts for the
+    dashboard. The counts run on the query pool while the page is read; with
+    the unread filter the total *is* the unread count, and the unfiltered
+    total comes from collection metadata instead of a full count.
+    """
+    db     = get_db()
+    unread = {"acknowledged": False}
+    query  = unread if unacknowledged_only else {}
+
+    unread_count = _QUERY_POOL.submit(db.alerts.count_documents, unread)
+    total_count  = None
+    if not unacknowledged_only:
+        total_count = _QUERY_POOL.submit(db.alerts.estimated_document_count)
+
+    docs     = db.alerts.find(query).sort("created_at", -1).skip(skip).limit(limit)
+    alerts   = serialize_list(list(docs))
+    n_unread = unread_count.result()
+    return {
+        "alerts": alerts,
+        "total":  n_unread if total_count is None else total_count.result(),
+        "unread": n_unread,
+    }
+
+
 def acknowledge_alert(alert_id: str) -> bool:
     db     = get_db()
     result = db.alerts.update_one(
         {"_id": ObjectId(alert_id)},
-        {"$set": {"acknowledged": True, "acknowledged_at": datetime.utcnow().isoformat()}}
+        {"$set": {"acknowledged": True, "acknowledged_at": datetime.utcnow()}}
     )
     return result.modified_count > 0
@@ -0,0 +1,16 @@
+"""
+PulseGuard AI - orjson-backed JSON Provider
+Used by request.get_json() and jsonify() across all blueprints.
+"""
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs) -> str:
+        # default=str covers ObjectId and any other non-JSON leftovers
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -2,10 +2,15 @@
 PulseGuard AI - ML Inference & Risk Drift Detection Engine
 """
 
+import hashlib
 import os
+import threading
+from itertools import chain
+from operator import itemgetter
 import numpy as np
 import joblib
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Union
 
 # ─── Constants ────────────────────────────────────────────────────────────────
 # Frontend sends these 12 fields
@@ -25,27 +30,127 @@ MODEL_FEATURES = [
 # Scaler expects these 5 features (in order)
 SCALER_FEATURES = ["Age", "Severity", "Whendiagnoused", "Systolic", "Diastolic"]
 
+# Encoded feature dict → tuple in MODEL_FEATURES order (C-level, no generator)
+_model_vector = itemgetter(*MODEL_FEATURES)
+
+# Positions of the scaler features inside MODEL_FEATURES (gather/scatter index)
+_SCALER_POS_IN_MODEL = np.array([MODEL_FEATURES.index(f) for f in SCALER_FEATURES])
+
+# Encoding bin edges for np.searchsorted(side="right"): the code for a value is
+# the number of edges <= it. Age is inclusive at 65, hence the nextafter edge.
+_AGE_BINS       = np.array([30, 50, np.nextafter(65, np.inf)])
+_SYSTOLIC_BINS  = np.array([120, 130, 140])
+_DIASTOLIC_BINS = np.array([80, 90, 100])
+
 STAGE_LABELS = {0: "Normal", 1: "Stage 1", 2: "Stage 2", 3: "Crisis"}
 STAGE_COLORS = {0: "green", 1: "yellow", 2: "orange", 3: "red"}
+_STAGE_LABEL_LIST = [STAGE_LABELS[i] for i in range(len(STAGE_LABELS))]
 
 MODEL_PATH  = os.path.join(os.path.dirname(__file__), "..", "models", "pulseguard_model.pkl")
 SCALER_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "scaler.pkl")
+# Plain numpy export of the two pickles (models/export_weights.py)
+WEIGHTS_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "pulseguard_model.npz")
+
+# Per-thread input buffers, reused across predictions (Gunicorn workers are threaded)
+_buffers = threading.local()
+
+
+def _get_buffers():
+    bufs = getattr(_buffers, "bufs", None)
+    if bufs is None:
+        bufs = _buffers.bufs = (
+            np.empty((1, len(SCALER_FEATURES))),
+            np.empty((1, len(MODEL_FEATURES))),
+        )
+    return bufs
+
 
 # ─── Singleton Model Loader ────────────────────────────────────────────────────
-_model  = None
-_scaler = None
+# Loaded eagerly at import so the first request doesn't pay the loading cost;
+# with Gunicorn's preload_app every forked worker shares the loaded arrays.
+#
+# Only the fitted arrays are kept: the model is a LogisticRegression over a
+# MinMaxScaler, so inference is one affine transform plus softmax in numpy,
+# without sklearn's per-call input validation. They are read from the .npz
+# export (no unpickling, no sklearn import) as long as it was exported from
+# the current pickles; otherwise the pickles are loaded instead.
+_params = None
+
+
+def _params_from_sklearn(model, scaler) -> dict:
+    return {
+        "coef_t":    model.coef_.T,             # (13, n_classes)
+        "intercept": model.intercept_,
+        "classes":   model.classes_,
+        # sklearn's one-vs-rest normalisation vs. multinomial softmax
+        "ovr":       getattr(model, "multi_class", "auto") == "ovr"
+                     or getattr(model, "solver", "") == "liblinear",
+        "scale":     scaler.scale_,
+        "min":       scaler.min_,
+    }
 
 
-def _load_model():
-    global _model, _scaler
-    if _model is None:
-        if not os.path.exists(MODEL_PATH):
+def _pickles_digest() -> Optional[str]:
+    """Hash of the model + scaler pickles, stored in the .npz at export time."""
+    if not (os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH)):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    for path in (MODEL_PATH, SCALER_PATH):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _load_model() -> dict:
+    global _params
+    if _params is None:
+        digest = _pickles_digest()
+        if os.path.exists(WEIGHTS_PATH):
+            with np.load(WEIGHTS_PATH, allow_pickle=False) as weights:
+                params = {k: weights[k] for k in weights.files}
+            exported_from = str(params.pop("source_digest", ""))
+            if digest is None or exported_from == digest:
+                params["ovr"] = bool(params["ovr"])
+                _params = params
+                print(f"Loaded model weights from {os.path.normpath(WEIGHTS_PATH)}")
+                return _params
+            print(
+                "Model weights export is stale (pickles changed since export); "
+                "loading the pickles. Run `python models/export_weights.py`."
+            )
+        if digest is not None:
+            _params = _params_from_sklearn(
+                joblib.load(MODEL_PATH,  mmap_mode="r"),
+                joblib.load(SCALER_PATH, mmap_mode="r"),
+            )
+            print(f"Loaded model weights from {os.path.normpath(MODEL_PATH)}")
+        else:
             raise FileNotFoundError(
                 "Model not found. Run `python models/train_model.py` first."
             )
-        _model  = joblib.load(MODEL_PATH)
-        _scaler = joblib.load(SCALER_PATH)
-    return _model, _scaler
+    return _params
+
+
+def _linear_predict(X: np.ndarray, params: dict):
+    """Return (stages, probabilities) for a scaled (N, 13) feature matrix."""
+    logits = X @ params["coef_t"] + params["intercept"]
+    stages = params["classes"][logits.argmax(axis=1)]
+
+    if params["ovr"]:
+        proba = 1.0 / (1.0 + np.exp(-logits))
+    else:
+        proba = np.exp(logits - logits.max(axis=1, keepdims=True))
+    proba /= proba.sum(axis=1, keepdims=True)
+    return stages, proba
+
+
+if os.path.exists(WEIGHTS_PATH) or os.path.exists(MODEL_PATH):
+    _load_model()
+
+
+def _bucketize(value, bins: np.ndarray) -> int:
+    """Index of the bin `value` falls into (number of edges <= value)."""
+    return int(np.searchsorted(bins, value, side="right"))
 
 
 def _map_frontend_to_model(data: dict) -> dict:
@@ -61,34 +166,13 @@ def _map_frontend_to_model(data: dict) -> dict:
     raw_dia = data.get("diastolic_bp", 80)
 
     # Encode Age: 1=young(<30), 2=middle(30-49), 3=senior(50-65), 4=elderly(>65)
-    if raw_age < 30:
-        age_enc = 1
-    elif raw_age < 50:
-        age_enc = 2
-    elif raw_age <= 65:
-        age_enc = 3
-    else:
-        age_enc = 4
+    age_enc = 1 + _bucketize(raw_age, _AGE_BINS)
 
     # Encode Systolic BP: 0=Normal(<120), 1=Elevated(120-129), 2=Stage1(130-139), 3=Stage2+(>=140)
-    if raw_sys < 120:
-        sys_enc = 0
-    elif raw_sys < 130:
-        sys_enc = 1
-    elif raw_sys < 140:
-        sys_enc = 2
-    else:
-        sys_enc = 3
+    sys_enc = _bucketize(raw_sys, _SYSTOLIC_BINS)
 
     # Encode Diastolic BP: 0=Normal(<80), 1=Stage1(80-89), 2=Stage2(90-99), 3=Crisis(>=100)
-    if raw_dia < 80:
-        dia_enc = 0
-    elif raw_dia < 90:
-        dia_enc = 1
-    elif raw_dia < 100:
-        dia_enc = 2
-    else:
-        dia_enc = 3
+    dia_enc = _bucketize(raw_dia, _DIASTOLIC_BINS)
 
     # Encode Severity: 0=low, 1=moderate, 2=severe (derived from BP stage)
     bp_max_enc = max(sys_enc, dia_enc)
@@ -143,29 +227,57 @@ def predict_hypertension(patient_data: dict) -> dict:
           "color": str
         }
     """
-    model, scaler = _load_model()
-
-    # Map frontend data to model features
+    # The model only sees the encoded features, whose value space is small and
+    # finite — many distinct raw inputs share one cached prediction.
     mapped = _map_frontend_to_model(patient_data)
+    result = _predict_encoded(_model_vector(mapped))
 
-    # Scale only the 5 features the scaler expects
-    scaler_vector = np.array([[mapped[f] for f in SCALER_FEATURES]], dtype=float)
-    scaled_values = scaler.transform(scaler_vector)[0]
+    # Copy so callers can't mutate the cached entry
+    return {**result, "probabilities": dict(result["probabilities"])}
 
-    # Build the full 13-feature vector, substituting scaled values
-    scaled_map = dict(zip(SCALER_FEATURES, scaled_values))
-    full_vector = []
-    for f in MODEL_FEATURES:
-        if f in scaled_map:
-            full_vector.append(scaled_map[f])
-        else:
-            full_vector.append(float(mapped[f]))
 
-    feature_array = np.array([full_vector], dtype=float)
+@lru_cache(maxsize=4096)
+def _predict_encoded(features: tuple) -> dict:
+    """Run scaler + model for one encoded feature vector (MODEL_FEATURES order)."""
+    params = _load_model()
+    scaler_buf, feature_array = _get_buffers()
+
+    # Fill the model vector with the raw encodings, then gather the 5 scaler
+    # features, scale them in place and scatter them back to their slots
+    feature_array[0] = features
+    np.take(feature_array[0], _SCALER_POS_IN_MODEL, out=scaler_buf[0])
+    scaler_buf *= params["scale"]
+    scaler_buf += params["min"]
+    feature_array[0, _SCALER_POS_IN_MODEL] = scaler_buf[0]
+
+    stages, probas = _linear_predict(feature_array, params)
+    stage, proba   = int(stages[0]), probas[0]
+    return _format_prediction(stage, proba)
+
+
+def predict_hypertension_batch(patients: List[Dict]) -> List[dict]:
+    """
+    Predict several patients with one vectorised scaler + model pass.
+
+    Returns one result per input, in order, shaped like predict_hypertension().
+    """
+    if not patients:
+        return []
+    params = _load_model()
+
+    # Stream the encodings straight into the matrix — no nested lists
+    n = len(patients)
+    X = np.fromiter(
+        chain.from_iterable(_model_vector(_map_frontend_to_model(p)) for p in patients),
+        dtype=float, count=n * len(MODEL_FEATURES),
+    ).reshape(n, len(MODEL_FEATURES))
+    X[:, _SCALER_POS_IN_MODEL] = X[:, _SCALER_POS_IN_MODEL] * params["scale"] + params["min"]
 
-    stage = int(model.predict(feature_array)[0])
-    proba = model.predict_proba(feature_array)[0]
+    stages, probas = _linear_predict(X, params)
+    return [_format_prediction(int(st), pr) for st, pr in zip(stages, probas)]
 
+
+def _format_prediction(stage: int, proba) -> dict:
     # Risk score = probability of being in Stage 2 or Crisis
     risk_score = float((proba[2] + proba[3]) * 100)
 
@@ -173,17 +285,25 @@ def predict_hypertension(patient_data: dict) -> dict:
         "stage":        stage,
         "stage_label":  STAGE_LABELS[stage],
         "risk_score":   round(risk_score, 2),
-        "probabilities": {
-            STAGE_LABELS[i]: round(float(p) * 100, 2) for i, p in enumerate(proba)
-        },
+        "probabilities": dict(zip(_STAGE_LABEL_LIST, np.round(proba * 100.0, 2).tolist())),
         "color": STAGE_COLORS[stage],
     }
 
 
 # ─── Risk Drift Detection Engine ──────────────────────────────────────────────
 
+def _slope(y: List[float]) -> float:
+    """Least-squares slope of y against x = 0..n-1 (closed form; n >= 2)."""
+    n      = len(y)
+    x_mean = (n - 1) / 2
+    y_mean = sum(y) / n
+    num = sum((i - x_mean) * (v - y_mean) for i, v in enumerate(y))
+    den = sum((i - x_mean) ** 2 for i in range(n))
+    return float(num / den)
+
+
 def detect_risk_drift(
-    visit_scores: List[float],
+    visit_scores: Union[List[float], np.ndarray],
     drift_threshold: float = 15.0,
     high_threshold: float = 25.0,
     window: int = 3,
@@ -207,21 +327,24 @@ def detect_risk_drift(
           "analyzed_scores": list
         }
     """
-    if len(visit_scores) < 2:
+    # Only the window is ever read, so slice before any per-element work.
+    # numpy input is accepted as-is; the tail becomes plain floats for JSON.
+    recent = visit_scores[-window:]
+    if isinstance(recent, np.ndarray):
+        recent = recent.tolist()
+
+    if len(recent) < 2:
         return {
             "alert_level":    "STABLE",
             "drift_value":    0.0,
             "slope":          0.0,
             "trend":          "STABLE",
             "message":        "Insufficient visit data for drift analysis.",
-            "analyzed_scores": visit_scores,
+            "analyzed_scores": recent,
         }
 
-    recent = visit_scores[-window:]
-
     # Compute slope via linear regression over recent visits
-    x      = np.arange(len(recent), dtype=float)
-    slope  = float(np.polyfit(x, recent, 1)[0])
+    slope = _slope(recent)
 
     # Drift = absolute change from first to last in window
     drift_value = float(recent[-1] - recent[0])
@@ -264,13 +387,14 @@ def detect_risk_drift(
 
 # ─── Helper: Build Patient Risk History Summary ────────────────────────────────
 
-def build_risk_summary(visits: List[Dict]) -> dict:
+def build_risk_summary(visits: List[Dict], window: int = 3) -> dict:
     """
     Given a list of visit dicts (each with 'risk_score', 'stage_label', 'visit_date'),
     return drift analysis plus a formatted timeline.
     """
-    scores  = [v["risk_score"] for v in visits]
-    drift   = detect_risk_drift(scores)
+    # Drift only looks at the last `window` visits
+    scores_tail = [v["risk_score"] for v in visits[-window:]]
+    drift       = detect_risk_drift(scores_tail, window=window)
 
     timeline = [
         {
@@ -5,21 +5,40 @@ Generates a professional medical-style Blood Pressure Health Report using Report
 Usage:
     from utils.pdf_report import generate_bp_report_pdf
     pdf_bytes = generate_bp_report_pdf(patient_data, clinical_inputs, prediction_results, recommendations)
+
+    from utils.pdf_report import generate_bp_reports_bulk
+    pdfs = generate_bp_reports_bulk([(patient_data, clinical_inputs, prediction_results, recommendations), ...])
 """
 
 import io
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from typing import BinaryIO, List, Optional, Tuple
+
+# Attribute validation on graphics shapes is a development aid. shapes.py reads
+# this flag once at import to decide whether to install its checking
+# __setattr__, so it must be cleared before reportlab.graphics is imported.
+from reportlab import rl_config
+rl_config.shapeChecking = 0
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.pdfgen import canvas
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    HRFlowable, KeepTogether
+    Paragraph, Spacer, Table, TableStyle,
+    HRFlowable, KeepTogether, Flowable, Preformatted
 )
-from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.platypus.doctemplate import ActionFlowable, FrameBreak, LayoutError
 from reportlab.graphics import renderPDF
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 
@@ -114,27 +133,179 @@ def _build_styles():
         ),
         "normal": base["Normal"],
     }
+    styles["disc_header"] = ParagraphStyle(
+        "disc_header",
+        parent=styles["disclaimer"],
+        fontSize=9,
+        textColor=colors.HexColor("#555555"),
+        fontName="Helvetica-Bold",
+    )
     return styles
 
 
+# Built once and shared by every report — treat as read-only
+_STYLES = _build_styles()
+
+
+# ─── Table Styles ─────────────────────────────────────────────────────────────
+# The table commands are static, so each TableStyle is built once and shared
+
+def _info_block_commands(first: int, last: int) -> list:
+    """Label/value styling for info rows first..last."""
+    return [
+        ("BACKGROUND",    (0, first), (-1, last), LIGHT_BLUE_BG),
+        ("GRID",          (0, first), (-1, last), 0.3, colors.HexColor("#CCCCCC")),
+        # Cells are plain strings; these mirror the field_label / field_value styles
+        ("FONTNAME",      (0, first), (0, last),  "Helvetica-Bold"),
+        ("FONTSIZE",      (0, first), (0, last),  9),
+        ("TEXTCOLOR",     (0, first), (0, last),  colors.grey),
+        ("FONTNAME",      (1, first), (1, last),  "Helvetica"),
+        ("FONTSIZE",      (1, first), (1, last),  10),
+        ("TEXTCOLOR",     (1, first), (1, last),  colors.HexColor("#222222")),
+    ]
+
+
+def _info_header_commands(row: int) -> list:
+    """A spanning row drawn like the _SectionHeader bar."""
+    return [
+        ("SPAN",          (0, row), (-1, row)),
+        ("BACKGROUND",    (0, row), (-1, row), SECTION_HEADER),
+        ("FONTNAME",      (0, row), (-1, row), "Helvetica-Bold"),
+        ("FONTSIZE",      (0, row), (-1, row), 12),
+        ("TEXTCOLOR",     (0, row), (-1, row), colors.white),
+        ("TOPPADDING",    (0, row), (-1, row), 10),
+        ("BOTTOMPADDING", (0, row), (-1, row), 10),
+        ("LEFTPADDING",   (0, row), (-1, row), 14),
+    ]
+
+
+# Info tables come in a handful of fixed layouts — one TableStyle per layout
+_INFO_TS_CACHE = {}
+
+
+def _info_table_style(n_rows: int, header_rows: tuple) -> TableStyle:
+    key = (n_rows, header_rows)
+    ts  = _INFO_TS_CACHE.get(key)
+    if ts is None:
+        cmds = [
+            ("TOPPADDING",    (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("LEFTPADDING",   (0, 0), (-1, -1), 8),
+            ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+        ]
+        # Each header row sits below an unstyled gap row (header - 1)
+        first = 0
+        for h in header_rows:
+            if h - 2 >= first:
+                cmds += _info_block_commands(first, h - 2)
+            cmds += _info_header_commands(h)
+            first = h + 1
+        if n_rows - 1 >= first:
+            cmds += _info_block_commands(first, n_rows - 1)
+        ts = _INFO_TS_CACHE[key] = TableStyle(cmds)
+    return ts
+
+
+# Rows tagged with this in place of a label start a new titled section
+_SECTION = object()
+
+# Value column width minus cell padding; longer values need a wrapping Paragraph
+_INFO_VALUE_WIDTH = 4.5 * inch - 8 - 6
+_SECTION_GAP      = 20   # space above an in-table section header
+
+_PROB_TS = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, 0),  BRAND_BLUE),
+    ("TEXTCOLOR",     (0, 0), (-1, 0),  colors.white),
+    ("FONTNAME",      (0, 0), (-1, 0),  "Helvetica-Bold"),
+    ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
+    ("GRID",          (0, 0), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
+    ("BACKGROUND",    (0, 1), (-1, -1), LIGHT_BLUE_BG),
+    ("TOPPADDING",    (0, 0), (-1, -1), 7),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
+])
+
+# The risk box border follows the stage colour — one style per colour
+_RISK_TS_CACHE = {}
+
+
+def _risk_table_style(risk_color) -> TableStyle:
+    key = risk_color.hexval()
+    ts  = _RISK_TS_CACHE.get(key)
+    if ts is None:
+        ts = _RISK_TS_CACHE[key] = TableStyle([
+            ("BACKGROUND",    (0, 0), (-1, -1), colors.HexColor("#F9F9F9")),
+            ("BOX",           (0, 0), (-1, -1), 2, risk_color),
+            ("TOPPADDING",    (0, 0), (-1, -1), 14),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
+            ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
+        ])
+    return ts
+
+
 # ─── Helper: Section Header Bar ───────────────────────────────────────────────
 
-def _section_header(title: str, styles: dict):
-    """Returns a blue header bar paragraph."""
-    # We simulate a colored header using a single-cell table
-    header_table = Table(
-        [[Paragraph(f"  {title}", styles["section_header"])]],
-        colWidths=[6.5 * inch],
-    )
-    header_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), SECTION_HEADER),
-        ("ROWBACKGROUND", (0, 0), (-1, -1), SECTION_HEADER),
-        ("TOPPADDING",    (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 10),
-        ("ROUNDEDCORNERS", [4, 4, 4, 4]),
-    ]))
-    return header_table
+class _SectionHeader(Flowable):
+    """
+    Blue header bar with the section title, drawn straight onto the canvas.
+    Same geometry as the single-cell Table it replaces: 6.5in wide, centred,
+    30pt tall with 4pt rounded corners.
+    """
+
+    bar_width  = 6.5 * inch
+    bar_height = 30
+
+    def __init__(self, title: str):
+        super().__init__()
+        self.title  = title
+        self.hAlign = "CENTER"
+
+    def wrap(self, availWidth, availHeight):
+        # Flowable.__init__ zeroes width/height; hAlign needs the real width
+        self.width, self.height = self.bar_width, self.bar_height
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        canv.setFillColor(SECTION_HEADER)
+        canv.roundRect(0, 0, self.width, self.height, 4, fill=1, stroke=0)
+        canv.setFillColor(colors.white)
+        canv.setFont("Helvetica-Bold", 12)
+        canv.drawString(18, 12, self.title)
+
+
+# Drift alert row text and colour per level, built once
+_ALERT_LINES = {
+    level: (f"Drift Alert Level: {level}", colors.HexColor(hexcol))
+    for level, hexcol in (("STABLE", "#27AE60"), ("MODERATE", "#F39C12"), ("HIGH", "#E74C3C"))
+}
+_ALERT_OTHER_COLOR = colors.HexColor("#888888")
+
+
+class _AlertLine(Flowable):
+    """
+    Bold, coloured "Drift Alert Level: X" row, drawn without Paragraph/Table.
+    A fresh instance per report: drawOn() stores the canvas on the flowable,
+    so a shared one wouldn't be safe across threads.
+    """
+
+    line_width  = 6.5 * inch
+    line_height = 24
+
+    def __init__(self, alert_level: str):
+        super().__init__()
+        self.hAlign = "CENTER"
+        line = _ALERT_LINES.get(alert_level)
+        self.text, self.color = line if line else (f"Drift Alert Level: {alert_level}", _ALERT_OTHER_COLOR)
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self.line_width, self.line_height
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        canv.setFillColor(self.color)
+        canv.setFont("Helvetica-Bold", 10)
+        canv.drawString(6, 8, self.text)
 
 
 # ─── Helper: Two-Column Info Table ────────────────────────────────────────────
@@ -142,25 +313,30 @@ def _section_header(title: str, styles: dict):
 def _info_table(rows: list, styles: dict):
     """
     Renders a clean 2-col label/value table.
-    rows = [("Label", "Value"), ...]
+    rows = [("Label", "Value"), ...]; a (_SECTION, "Title") row starts another
+    titled section inside the same table, so consecutive sections share one
+    Table layout pass.
     """
-    table_data = [
-        [
-            Paragraph(label, styles["field_label"]),
-            Paragraph(str(value), styles["field_value"]),
-        ]
-        for label, value in rows
-    ]
-    t = Table(table_data, colWidths=[2.0 * inch, 4.5 * inch])
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), LIGHT_BLUE_BG),
-        ("ROWBACKGROUND", (0, 0), (-1, 0), colors.HexColor("#D6E8FF")),
-        ("GRID",       (0, 0), (-1, -1), 0.3, colors.HexColor("#CCCCCC")),
-        ("TOPPADDING",    (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 8),
-        ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
-    ]))
+    # Plain-string cells skip Paragraph's markup parsing and layout; only a
+    # value too wide for its column (e.g. an address) is wrapped
+    table_data  = []
+    row_heights = []
+    header_rows = []
+    for label, value in rows:
+        if label is _SECTION:
+            table_data.append(["", ""])
+            row_heights.append(_SECTION_GAP)
+            header_rows.append(len(table_data))
+            table_data.append([f"  {value}", ""])
+            row_heights.append(None)
+            continue
+        value = str(value)
+        if stringWidth(value, "Helvetica", 10) > _INFO_VALUE_WIDTH:
+            value = Paragraph(value, styles["field_value"])
+        table_data.append([label, value])
+        row_heights.append(None)
+    t = Table(table_data, colWidths=[2.0 * inch, 4.5 * inch], rowHeights=row_heights)
+    t.setStyle(_info_table_style(len(table_data), tuple(header_rows)))
     return t
 
 
@@ -170,8 +346,9 @@ def _risk_box(stage_label: str, risk_score: float, styles: dict):
     """Draws a colored box showing the hypertension stage and risk score."""
     risk_color = RISK_COLORS.get(stage_label, colors.grey)
 
-    stage_para = Paragraph(stage_label, styles["risk_label"])
-    stage_para.style.textColor = risk_color
+    # Per-call child style: the shared risk_label style must not be recoloured
+    stage_style = ParagraphStyle("risk_label_dyn", parent=styles["risk_label"], textColor=risk_color)
+    stage_para  = Paragraph(stage_label, stage_style)
 
     score_para = Paragraph(
         f"Risk Score: <b>{risk_score:.1f}%</b>",
@@ -182,69 +359,208 @@ def _risk_box(stage_label: str, risk_score: float, styles: dict):
         [[stage_para], [score_para]],
         colWidths=[6.5 * inch],
     )
-    box.setStyle(TableStyle([
-        ("BACKGROUND",    (0, 0), (-1, -1), colors.HexColor("#F9F9F9")),
-        ("BOX",           (0, 0), (-1, -1), 2, risk_color),
-        ("TOPPADDING",    (0, 0), (-1, -1), 14),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
-        ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
-    ]))
+    box.setStyle(_risk_table_style(risk_color))
     return box
 
 
 # ─── Helper: Probability Bar Chart ────────────────────────────────────────────
 
-def _probability_chart(probabilities: dict):
+_VALUE_LABEL_COLOR = colors.HexColor("#333333")
+_CATEGORY_LABEL_COLOR = colors.HexColor("#555555")
+
+
+class _ProbBarsFlowable(Flowable):
     """
-    Draws a simple horizontal bar chart of class probabilities.
-    probabilities = {"Normal": 5.0, "Stage 1": 15.0, "Stage 2": 58.0, "Crisis": 22.0}
+    Simple vertical bar chart of class probabilities, drawn straight onto the
+    canvas (no Drawing/shape objects to build per report).
+    Takes labels, values and their "58.0%" strings already split out by the
+    caller, so the probabilities dict is walked only once.
     """
-    labels = list(probabilities.keys())
-    values = [probabilities[l] for l in labels]
-    bar_colors = [RISK_COLORS.get(l, colors.grey) for l in labels]
 
-    drawing = Drawing(400, 130)
-
-    # Draw bars manually (simple, no chart library quirks)
     bar_width = 60
     spacing   = 30
     max_val   = 100
     chart_h   = 90
     x_start   = 40
+    y_base    = 20
+
+    def __init__(self, labels: list, values: list, formatted: list):
+        super().__init__()
+        self.labels     = tuple(labels)
+        self.values     = tuple(values)
+        self.formatted  = tuple(formatted)
+        self.bar_colors = tuple(RISK_COLORS.get(l, colors.grey) for l in self.labels)
+
+    def wrap(self, availWidth, availHeight):
+        return 400, 130
 
-    for i, (label, val, col) in enumerate(zip(labels, values, bar_colors)):
-        x       = x_start + i * (bar_width + spacing)
-        bar_h   = int((val / max_val) * chart_h)
-        y_base  = 20
+    def draw(self):
+        canv    = self.canv
+        bw      = self.bar_width
+        half_bw = bw / 2
+        step    = bw + self.spacing
+        scale   = self.chart_h / self.max_val
+        x       = self.x_start
+        y_base  = self.y_base
+        canv.setFont("Helvetica", 8)
 
-        # Bar
-        drawing.add(Rect(x, y_base, bar_width, bar_h, fillColor=col, strokeColor=col))
+        for label, val, text, col in zip(self.labels, self.values, self.formatted, self.bar_colors):
+            bar_h = int(val * scale)
+            cx    = x + half_bw
 
-        # Value label above bar
-        drawing.add(String(
-            x + bar_width / 2, y_base + bar_h + 4,
-            f"{val:.1f}%",
-            fontSize=8, textAnchor="middle", fillColor=colors.HexColor("#333333")
-        ))
+            # Bar
+            canv.setFillColor(col)
+            canv.setStrokeColor(col)
+            canv.rect(x, y_base, bw, bar_h, fill=1, stroke=1)
 
-        # Category label below bar
-        drawing.add(String(
-            x + bar_width / 2, y_base - 12,
-            label,
-            fontSize=8, textAnchor="middle", fillColor=colors.HexColor("#555555")
-        ))
+            # Value label above bar
+            canv.setFillColor(_VALUE_LABEL_COLOR)
+            canv.drawCentredString(cx, y_base + bar_h + 4, text)
 
-    return drawing
+            # Category label below bar
+            canv.setFillColor(_CATEGORY_LABEL_COLOR)
+            canv.drawCentredString(cx, y_base - 12, label)
+            x += step
 
 
-# ─── Main PDF Generator Function ──────────────────────────────────────────────
+# Characters that can start Paragraph markup or an entity
+_MARKUP_RE = re.compile(r"[<&]")
+
+
+class _PlainLine(Preformatted):
+    """
+    A markup-free recommendation line. Wraps greedily on spaces like Paragraph
+    does, but draws the text as-is without going through the XML parser.
+    A word wider than the line (e.g. a long URL) is broken by characters, as
+    Paragraph's splitLongWords does. `indent` is prepended to the first line only.
+    """
+
+    def __init__(self, text: str, style: ParagraphStyle, indent: str = ""):
+        super().__init__("", style)
+        self._words = text.split()
+        if indent and self._words:
+            self._words[0] = indent + self._words[0]
+
+    def wrap(self, availWidth, availHeight):
+        st     = self.style
+        max_w  = availWidth - st.leftIndent - st.rightIndent
+        space  = stringWidth(" ", st.fontName, st.fontSize)
+        shrink = st.spaceShrinkage * space   # Paragraph's per-space slack
+        lines, cur, w = [], [], -space
+        for word in self._words:
+            ww = stringWidth(word, st.fontName, st.fontSize)
+            if ww > max_w:
+                # First piece fills the rest of the current line, the rest get full lines
+                piece, w = "", w + space
+                for c in word:
+                    cw = stringWidth(c, st.fontName, st.fontSize)
+                    if w + cw > max_w and (piece or cur):
+                        if piece:
+                            cur.append(piece)
+                        lines.append(" ".join(cur))
+                        cur, piece, w = [], "", 0
+                    piece += c
+                    w += cw
+                cur.append(piece)
+                continue
+            if cur and w + space + ww > max_w + shrink * len(cur):
+                lines.append(" ".join(cur))
+                cur, w = [], -space
+            cur.append(word)
+            w += space + ww
+        if cur:
+            lines.append(" ".join(cur))
+        self.lines = lines
+        return super().wrap(availWidth, availHeight)
+
+
+# ─── Page Layout ──────────────────────────────────────────────────────────────
+
+# Letter page, 0.75in margins, plus the 6pt padding a platypus Frame adds
+_FRAME_PAD      = 6
+_CONTENT_X      = 0.75 * inch + _FRAME_PAD
+_CONTENT_WIDTH  = letter[0] - 1.5 * inch - 2 * _FRAME_PAD
+_CONTENT_TOP    = letter[1] - 0.75 * inch - _FRAME_PAD
+_CONTENT_BOTTOM = 0.75 * inch + _FRAME_PAD
+_FUZZ           = 1e-6
+_FRAME_BREAK    = type(FrameBreak)   # reportlab exports FrameBreak as an instance
+
+
+def _draw_story(canv, story: list):
+    """
+    Place the flowables top-down on the canvas, tracking cursor_y and starting
+    a new page when the next one doesn't fit. The report is a single column on
+    fixed margins, so this replaces SimpleDocTemplate's page-template/frame
+    machinery. Spacing follows Frame: no space-before at the top of a page, and
+    space-before overlaps the previous flowable's space-after.
+    """
+    pending    = deque(story)
+    cursor_y   = _CONTENT_TOP
+    at_top     = True
+    prev_after = 0
+
+    while pending:
+        f = pending.popleft()
+        if isinstance(f, ActionFlowable):
+            # Only FrameBreak (from KeepTogether.split) means anything here
+            if isinstance(f, _FRAME_BREAK) and not at_top:
+                canv.showPage()
+                cursor_y, at_top, prev_after = _CONTENT_TOP, True, 0
+            continue
+
+        space = 0 if at_top else max(f.getSpaceBefore() - prev_after, 0)
+        avail = cursor_y - _CONTENT_BOTTOM - space
+        w, h  = f.wrapOn(canv, _CONTENT_WIDTH, avail) if avail > 0 else (0, avail + 1)
+
+        if h <= avail + _FUZZ:
+            cursor_y -= space + h
+            f.drawOn(canv, _CONTENT_X, cursor_y, _sW=_CONTENT_WIDTH - w)
+            prev_after = f.getSpaceAfter()
+            cursor_y  -= prev_after
+            at_top     = False
+            continue
+
+        parts = f.splitOn(canv, _CONTENT_WIDTH, avail) if avail > 0 else []
+        if parts and parts[0] is not f:
+            pending.extendleft(reversed(parts))
+        elif at_top:
+            raise LayoutError(f"{f.__class__.__name__} ({w}x{h} pt) too large for the page")
+        else:
+            pending.appendleft(f)
+            canv.showPage()
+            cursor_y, at_top, prev_after = _CONTENT_TOP, True, 0
+
+    canv.showPage()
+
+
+# One output buffer per thread (per process under generate_bp_reports_bulk),
+# emptied and reused by each report instead of allocating a new BytesIO
+_tls = threading.local()
+
+
+def _thread_buffer() -> io.BytesIO:
+    buffer = getattr(_tls, "buf", None)
+    if buffer is None:
+        buffer = _tls.buf = io.BytesIO()
+    else:
+        buffer.seek(0)
+        buffer.truncate(0)
+    return buffer
+
+
+@lru_cache(maxsize=1)
+def _report_date(minute_key: int) -> str:
+    """Header timestamp; only minutes are shown, so format it once per minute."""
+    return datetime.now().strftime('%B %d, %Y  |  %I:%M %p')
+
 
 def generate_bp_report_pdf(
     patient_data: dict,
     clinical_inputs: dict,
     prediction_results: dict,
     recommendations: str,
-) -> bytes:
+    out: Optional[BinaryIO] = None,
+) -> Optional[bytes]:
     """
     Generate a professional medical-style Blood Pressure Health Report PDF.
 
@@ -253,9 +569,11 @@ def generate_bp_report_pdf(
         clinical_inputs:    Clinical measurements used for prediction
         prediction_results: Output from predict_hypertension() — stage, risk_score, probabilities
         recommendations:    Personalized advice string (from chatbot or rule-based)
+        out:                Optional writable binary stream; the PDF is written
+                            straight into it and nothing is returned
 
     Returns:
-        PDF as bytes (ready to send as Flask response)
+        PDF as bytes (ready to send as Flask response), or None if `out` was given
 
     Example:
         pdf_bytes = generate_bp_report_pdf(
@@ -267,34 +585,27 @@ def generate_bp_report_pdf(
         # Then send as Flask response
     """
 
-    # Build PDF into memory buffer (no file written to disk)
-    buffer = io.BytesIO()
-    styles = _build_styles()
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.75 * inch,
-        leftMargin=0.75 * inch,
-        topMargin=0.75 * inch,
-        bottomMargin=0.75 * inch,
-        title="Blood Pressure Health Report",
-        author="PulseGuard AI",
-    )
+    # Build PDF into the caller's stream, else a memory buffer (no file written to disk)
+    buffer = out if out is not None else _thread_buffer()
+    styles = _STYLES
+
+    canv = canvas.Canvas(buffer, pagesize=letter)
+    canv.setTitle("Blood Pressure Health Report")
+    canv.setAuthor("PulseGuard AI")
 
     story = []
 
     # ── HEADER ────────────────────────────────────────────────────────────────
-    story.append(Paragraph("🫀 Blood Pressure Health Report", styles["report_title"]))
+    story.append(Paragraph("Blood Pressure Health Report", styles["report_title"]))
     story.append(Paragraph("Generated by PulseGuard AI — Intelligent Hypertension Monitoring", styles["subtitle"]))
     story.append(Paragraph(
-        f"Report Date: {datetime.now().strftime('%B %d, %Y  |  %I:%M %p')}",
+        f"Report Date: {_report_date(int(time.time() // 60))}",
         styles["subtitle"]
     ))
     story.append(HRFlowable(width="100%", thickness=2, color=BRAND_BLUE, spaceAfter=12))
 
     # ── SECTION 1: PATIENT INFORMATION ────────────────────────────────────────
-    story.append(_section_header("1. Patient Information", styles))
+    story.append(_SectionHeader("1. Patient Information"))
     story.append(Spacer(1, 6))
 
     patient_rows = [
@@ -305,13 +616,9 @@ def generate_bp_report_pdf(
         ("Address",        patient_data.get("address", "N/A")),
         ("Patient ID",     patient_data.get("patient_id", "N/A")),
     ]
-    story.append(_info_table(patient_rows, styles))
-    story.append(Spacer(1, 14))
 
     # ── SECTION 2: CLINICAL INPUTS ────────────────────────────────────────────
-    story.append(_section_header("2. Clinical Inputs", styles))
-    story.append(Spacer(1, 6))
-
+    # Rendered in the same Table as section 1, under an in-table header row
     clinical_rows = [
         ("Age",                   f"{clinical_inputs.get('age', 'N/A')} years"),
         ("BMI",                   f"{clinical_inputs.get('bmi', 'N/A')}"),
@@ -325,11 +632,13 @@ def generate_bp_report_pdf(
         ("Physical Activity",     f"{clinical_inputs.get('physical_activity', 'N/A')} hrs/week"),
         ("Stress Level",          f"{clinical_inputs.get('stress_level', 'N/A')} / 10"),
     ]
-    story.append(_info_table(clinical_rows, styles))
+    story.append(_info_table(
+        patient_rows + [(_SECTION, "2. Clinical Inputs")] + clinical_rows, styles
+    ))
     story.append(Spacer(1, 14))
 
     # ── SECTION 3: PREDICTION RESULTS ─────────────────────────────────────────
-    story.append(_section_header("3. Prediction Results", styles))
+    story.append(_SectionHeader("3. Prediction Results"))
     story.append(Spacer(1, 8))
 
     stage_label = prediction_results.get("stage_label", "Unknown")
@@ -343,21 +652,7 @@ def generate_bp_report_pdf(
     ]))
 
     # Alert level row
-    alert_color_map = {"STABLE": "#27AE60", "MODERATE": "#F39C12", "HIGH": "#E74C3C"}
-    alert_color     = alert_color_map.get(alert_level, "#888888")
-    alert_table     = Table(
-        [[Paragraph(
-            f'<font color="{alert_color}"><b>Drift Alert Level: {alert_level}</b></font>',
-            styles["normal"]
-        )]],
-        colWidths=[6.5 * inch],
-    )
-    alert_table.setStyle(TableStyle([
-        ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
-        ("TOPPADDING",    (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-    ]))
-    story.append(alert_table)
+    story.append(_AlertLine(alert_level))
     story.append(Spacer(1, 10))
 
     # Probability breakdown table
@@ -366,32 +661,26 @@ def generate_bp_report_pdf(
         story.append(Paragraph("  Stage Probability Breakdown:", styles["field_label"]))
         story.append(Spacer(1, 6))
 
-        prob_data = [["Stage", "Probability"]] + [
-            [stage, f"{prob:.1f}%"] for stage, prob in probabilities.items()
-        ]
+        # One pass over the dict; the formatted strings are shared with the chart
+        labels    = list(probabilities)
+        values    = list(probabilities.values())
+        formatted = [f"{v:.1f}%" for v in values]
+
+        prob_data = [["Stage", "Probability"]] + [list(row) for row in zip(labels, formatted)]
         prob_table = Table(prob_data, colWidths=[3.25 * inch, 3.25 * inch])
-        prob_table.setStyle(TableStyle([
-            ("BACKGROUND",    (0, 0), (-1, 0),  BRAND_BLUE),
-            ("TEXTCOLOR",     (0, 0), (-1, 0),  colors.white),
-            ("FONTNAME",      (0, 0), (-1, 0),  "Helvetica-Bold"),
-            ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
-            ("GRID",          (0, 0), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
-            ("BACKGROUND",    (0, 1), (-1, -1), LIGHT_BLUE_BG),
-            ("TOPPADDING",    (0, 0), (-1, -1), 7),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 7),
-        ]))
+        prob_table.setStyle(_PROB_TS)
         story.append(prob_table)
         story.append(Spacer(1, 8))
 
         # Visual bar chart
         story.append(Paragraph("  Visual Risk Distribution:", styles["field_label"]))
         story.append(Spacer(1, 4))
-        story.append(_probability_chart(probabilities))
+        story.append(_ProbBarsFlowable(labels, values, formatted))
 
     story.append(Spacer(1, 14))
 
     # ── SECTION 4: PERSONALIZED RECOMMENDATIONS ───────────────────────────────
-    story.append(_section_header("4. Personalized Recommendations", styles))
+    story.append(_SectionHeader("4. Personalized Recommendations"))
     story.append(Spacer(1, 8))
 
     # Split recommendations by newline and render each line
@@ -401,20 +690,18 @@ def generate_bp_report_pdf(
         if not line:
             story.append(Spacer(1, 4))
             continue
-        # Render bullet points nicely
-        if line.startswith("•") or line.startswith("-"):
-            story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;{line}", styles["recommendation_text"]))
+        # Render bullet points nicely; lines without markup skip Paragraph's parser
+        bullet = line.startswith(("•", "-"))
+        if _MARKUP_RE.search(line):
+            text = f"&nbsp;&nbsp;&nbsp;{line}" if bullet else line
+            story.append(Paragraph(text, styles["recommendation_text"]))
         else:
-            story.append(Paragraph(line, styles["recommendation_text"]))
+            story.append(_PlainLine(line, styles["recommendation_text"], "   " if bullet else ""))
     story.append(Spacer(1, 20))
 
     # ── FOOTER: MEDICAL DISCLAIMER ────────────────────────────────────────────
     story.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=8))
-    story.append(Paragraph(
-        "<b>Medical Disclaimer</b>",
-        ParagraphStyle("disc_header", parent=styles["disclaimer"], fontSize=9,
-                       textColor=colors.HexColor("#555555"), fontName="Helvetica-Bold")
-    ))
+    story.append(Paragraph("<b>Medical Disclaimer</b>", styles["disc_header"]))
     story.append(Paragraph(
         "This report is generated by PulseGuard AI for informational and educational purposes only. "
         "It is NOT a substitute for professional medical advice, diagnosis, or treatment. "
@@ -429,7 +716,45 @@ def generate_bp_report_pdf(
     ))
 
     # ── BUILD PDF ─────────────────────────────────────────────────────────────
-    doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
\ No newline at end of file
+    _draw_story(canv, story)
+    canv.save()
+    if out is not None:
+        return None
+    # The buffer stays with the thread for the next report, so the caller gets
+    # an independent bytes object
+    return buffer.getvalue()
+
+
+# ─── Bulk Generation ──────────────────────────────────────────────────────────
+
+def _gbr_star(args: tuple) -> bytes:
+    return generate_bp_report_pdf(*args)
+
+
+def generate_bp_reports_bulk(
+    jobs: List[Tuple[dict, dict, dict, str]],
+    workers: Optional[int] = None,
+) -> List[bytes]:
+    """
+    Generate many reports in parallel (e.g. nightly patient summaries).
+
+    PDF building is CPU-bound pure Python, so threads would serialise on the
+    GIL; each report is instead built in its own worker process. Workers import
+    this module themselves, so the module-level styles and table styles are
+    rebuilt once per worker (cheap) rather than shipped across.
+
+    Args:
+        jobs:    (patient_data, clinical_inputs, prediction_results, recommendations)
+                 tuples, as for generate_bp_report_pdf
+        workers: Process count; defaults to os.cpu_count()
+
+    Returns:
+        PDF bytes for each job, in input order
+    """
+    if not jobs:
+        return []
+    workers   = workers or os.cpu_count() or 1
+    # A few chunks per worker: fewer IPC round-trips, still evenly balanced
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_gbr_star, jobs, chunksize=chunksize))
@@ -4,6 +4,14 @@ PulseGuard AI - Input Validation Helpers
 
 from typing import Tuple, Optional
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 REQUIRED_FEATURES = [
     "age", "gender", "bmi", "systolic_bp", "diastolic_bp",
     "heart_rate", "cholesterol", "glucose", "smoking",
@@ -25,6 +33,35 @@ FEATURE_RANGES = {
     "stress_level":      (1,   10),
 }
 
+# Frozen lookup forms of the above for the per-request hot path
+_REQUIRED_SET = frozenset(REQUIRED_FEATURES)
+_RANGE_ITEMS  = tuple((f, lo, hi) for f, (lo, hi) in FEATURE_RANGES.items())
+
+# Column order and bounds for the vectorised batch check
+_RANGE_FIELDS = [f for f, _, _ in _RANGE_ITEMS]
+_RANGE_LO     = np.array([lo for _, lo, _ in _RANGE_ITEMS], dtype=np.float64)
+_RANGE_HI     = np.array([hi for _, _, hi in _RANGE_ITEMS], dtype=np.float64)
+
+# Below this many rows the NumPy path wins (no thread fan-out to pay for)
+_NUMBA_MIN_ROWS = 1024
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _range_check_kernel(arr, lo, hi):
+        """Row-parallel range check; stops at a row's first bad field."""
+        n, m = arr.shape
+        ok = np.ones(n, dtype=np.bool_)
+        for i in prange(n):
+            for j in range(m):
+                v = arr[i, j]
+                # Written so NaN (missing field) fails too
+                if not (lo[j] <= v <= hi[j]):
+                    ok[i] = False
+                    break
+        return ok
+else:
+    _range_check_kernel = None
+
 
 def validate_patient_input(data: dict) -> Tuple[bool, Optional[str]]:
     """
@@ -34,18 +71,25 @@ def validate_patient_input(data: dict) -> Tuple[bool, Optional[str]]:
         (True, None) if valid
         (False, error_message) if invalid
     """
-    # Check all required fields present
-    missing = [f for f in REQUIRED_FEATURES if f not in data]
-    if missing:
+    # Check all required fields present (set comparison; the ordered list is
+    # only built for the error message)
+    if not data.keys() >= _REQUIRED_SET:
+        missing = [f for f in REQUIRED_FEATURES if f not in data]
         return False, f"Missing required fields: {', '.join(missing)}"
 
     # Check types and ranges
-    for field, (lo, hi) in FEATURE_RANGES.items():
+    for field, lo, hi in _RANGE_ITEMS:
         val = data.get(field)
-        try:
+        # JSON numbers arrive as float/int already; only other types need float()
+        if type(val) is float:
+            pass
+        elif type(val) is int:
             val = float(val)
-        except (TypeError, ValueError):
-            return False, f"Field '{field}' must be a number."
+        else:
+            try:
+                val = float(val)
+            except (TypeError, ValueError):
+                return False, f"Field '{field}' must be a number."
 
         if not (lo <= val <= hi):
             return False, f"Field '{field}' must be between {lo} and {hi}. Got {val}."
@@ -53,6 +97,46 @@ def validate_patient_input(data: dict) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def validate_patient_inputs_batch(rows) -> np.ndarray:
+    """
+    Vectorised validate_patient_input for many patients at once.
+
+    Args:
+        rows: list of input dicts, or a pandas DataFrame with one row per patient
+
+    Returns:
+        Boolean mask, True where the row has every field and all are in range.
+        Call validate_patient_input on a failing row for its error message.
+
+    Large batches use a Numba-compiled, row-parallel kernel when numba is
+    installed; otherwise (and for small batches) the NumPy comparison.
+    """
+    n = len(rows)
+    if n == 0:
+        return np.ones(0, dtype=bool)
+
+    try:
+        if hasattr(rows, "reindex"):   # DataFrame; absent columns become NaN
+            arr = rows.reindex(columns=_RANGE_FIELDS).to_numpy(dtype=np.float64)
+        else:
+            arr = np.array(
+                [[r.get(f, np.nan) for f in _RANGE_FIELDS] for r in rows],
+                dtype=np.float64,
+            )
+    except (TypeError, ValueError):
+        # Some value isn't numeric — fall back to the row-by-row check
+        records = rows.to_dict("records") if hasattr(rows, "to_dict") else rows
+        return np.fromiter(
+            (validate_patient_input(r)[0] for r in records), dtype=bool, count=n
+        )
+
+    if _range_check_kernel is not None and n >= _NUMBA_MIN_ROWS:
+        return _range_check_kernel(arr, _RANGE_LO, _RANGE_HI)
+
+    # Missing fields are NaN, which fails both comparisons
+    return ((arr >= _RANGE_LO) & (arr <= _RANGE_HI)).all(axis=1)
+
+
 def validate_patient_profile(data: dict) -> Tuple[bool, Optional[str]]:
     """Validate basic patient profile fields."""
     required = ["name", "date_of_birth", "contact"]
@@ -64,7 +148,9 @@ def validate_patient_profile(data: dict) -> Tuple[bool, Optional[str]]:
 
 def sanitize_input(data: dict) -> dict:
     """Cast all feature values to float."""
-    return {
-        k: (float(v) if k in REQUIRED_FEATURES else v)
-        for k, v in data.items()
-    }
+    out = {}
+    req = _REQUIRED_SET
+    for k, v in data.items():
+        # Values that are already floats (the common JSON case) are kept as-is
+        out[k] = float(v) if (k in req and type(v) is not float) else v
+    return out